@@ -1,10 +1,48 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import os
-import numpy as np
+import aggregates
+import car_assets
+import data_store
+import model_registry
+import scatter_plot
+
+
+def _to_number(series, pattern):
+    # The snapshot already types these columns; only text needs the regex
+    if pd.api.types.is_numeric_dtype(series):
+        return series
+    return pd.to_numeric(series.astype(str).str.extract(pattern)[0], errors="coerce")
+
+
+def _analysis_frame(path):
+    # Renaming shares the snapshot's column data instead of copying it
+    df = data_store.load_listings(path).rename(columns=lambda c: c.strip().replace(" ", "_").title())
+
+    # Manufactured_By & Car_Model columns
+    if "Name" in df.columns:
+        df["Manufactured_By"] = df["Name"].str.split().str[0]
+        df["Car_Model"] = df["Name"].str.split().str[1:].str.join(" ")
+    elif "Brand" in df.columns:
+        df["Manufactured_By"] = df["Brand"]
+        if "Model" in df.columns:
+            df["Car_Model"] = df["Model"]
+    else:
+        df["Manufactured_By"] = "Unknown"
+        df["Car_Model"] = "Unknown"
+
+    if "Mileage" in df.columns:
+        df["Mileage_Num"] = _to_number(df["Mileage"], r"(\d+\.?\d*)")
+    if "Engine" in df.columns:
+        df["Engine_Num"] = _to_number(df["Engine"], r"(\d+)")
+    return df
+
+
+def load_data(path=data_store.DATASET_PATH):
+    """The page's frame with derived columns, shared across sessions. Do not mutate it."""
+    return model_registry.load(path, _analysis_frame)
+
 
 def app():
     # ===== Hero Header =====
@@ -26,31 +64,13 @@ def app():
     )
 
     # ===== Load Data =====
-    @st.cache_data
-    def load_data():
-        file_path = os.path.join(os.path.dirname(__file__), "car_dataset.csv")
-        if not os.path.exists(file_path):
-            st.error(f"❌ File not found: {file_path}")
-            st.stop()
-
-        df = pd.read_csv(file_path)
-        df = df.loc[:, ~df.columns.str.contains("unnamed", case=False)]  # drop Unnamed cols
-        df.columns = df.columns.str.strip().str.replace(" ", "_").str.title()
-
-        # Manufactured_By & Car_Model columns
-        if "Name" in df.columns:
-            df["Manufactured_By"] = df["Name"].str.split().str[0]
-            df["Car_Model"] = df["Name"].str.split().str[1:].str.join(" ")
-        elif "Brand" in df.columns:
-            df["Manufactured_By"] = df["Brand"]
-            if "Model" in df.columns:
-                df["Car_Model"] = df["Model"]
-        else:
-            df["Manufactured_By"] = "Unknown"
-            df["Car_Model"] = "Unknown"
-        return df
-
-    df = load_data()
+    file_path = data_store.DATASET_PATH
+    if not os.path.exists(file_path):
+        st.error(f"❌ File not found: {file_path}")
+        st.stop()
+
+    df = load_data(file_path)
+    cube = aggregates.load_cube()
 
     # ===== Column Glossary =====
     st.markdown("### 📋 Available Columns")
@@ -97,15 +117,13 @@ def app():
         stats.append({"label": "🚘 Cars", "value": f"{len(df):,}"})
 
         if "Km_Driven" in df.columns:
-            stats.append({"label": "🛣️ Avg Km Driven", "value": f"{df['Km_Driven'].mean():,.0f} km"})
+            stats.append({"label": "🛣️ Avg Km Driven", "value": f"{cube.total('km_driven'):,.0f} km"})
 
         if "Mileage" in df.columns:
-            df["Mileage_Num"] = pd.to_numeric(df["Mileage"].astype(str).str.extract(r"(\d+\.?\d*)")[0], errors="coerce")
-            stats.append({"label": "🌱 Avg Mileage", "value": f"{df['Mileage_Num'].mean():.1f} kmpl"})
+            stats.append({"label": "🌱 Avg Mileage", "value": f"{cube.total('mileage'):.1f} kmpl"})
 
         if "Engine" in df.columns:
-            df["Engine_Num"] = pd.to_numeric(df["Engine"].astype(str).str.extract(r"(\d+)")[0], errors="coerce")
-            stats.append({"label": "⚙️ Avg Engine", "value": f"{df['Engine_Num'].mean():,.0f} CC"})
+            stats.append({"label": "⚙️ Avg Engine", "value": f"{cube.total('engine'):,.0f} CC"})
 
         cols = st.columns(len(stats))
         for i, stat in enumerate(stats):
@@ -130,7 +148,7 @@ def app():
     # ===== Fuel Type Distribution =====
     if "Fuel_Type" in df.columns:
         st.markdown("## ⛽ Fuel Type Distribution")
-        fuel_counts = df["Fuel_Type"].value_counts().reset_index()
+        fuel_counts = cube.counts("fuel_type").reset_index()
         fuel_counts.columns = ["Fuel Type", "Count"]
         fig = px.pie(fuel_counts, values="Count", names="Fuel Type",
                      hole=0.4, color_discrete_sequence=px.colors.qualitative.Bold)
@@ -141,7 +159,7 @@ def app():
     # ===== Transmission =====
     if "Transmission" in df.columns:
         st.markdown("## ⚙️ Transmission Type")
-        trans_counts = df["Transmission"].value_counts().reset_index()
+        trans_counts = cube.counts("transmission").reset_index()
         trans_counts.columns = ["Transmission", "Count"]
         fig = px.bar(trans_counts, x="Transmission", y="Count", color="Transmission", template="plotly_dark")
         st.plotly_chart(fig, use_container_width=True)
@@ -149,7 +167,7 @@ def app():
     # ===== Car Year Distribution =====
     if "Year" in df.columns:
         st.markdown("## 📅 Car Year Distribution")
-        year_counts = df["Year"].value_counts().sort_index().reset_index()
+        year_counts = cube.table("year")["count"].reset_index()
         year_counts.columns = ["Year", "Count"]
         fig = px.bar(year_counts, x="Year", y="Count", template="plotly_dark")
         st.plotly_chart(fig, use_container_width=True)
@@ -157,25 +175,21 @@ def app():
     # ===== Mileage vs Engine =====
     if "Mileage_Num" in df.columns and "Engine_Num" in df.columns:
         st.markdown("## 📈 Mileage vs Engine")
-        plot_df = df.dropna(subset=["Mileage_Num", "Engine_Num"])
-        fig = px.scatter(plot_df, x="Engine_Num", y="Mileage_Num",
-                         color="Manufactured_By",
-                         hover_data=["Car_Model"] if "Car_Model" in df else None,
-                         template="plotly_dark")
+        fig = scatter_plot.scatter(df, x="Engine_Num", y="Mileage_Num",
+                                   color="Manufactured_By",
+                                   hover_data=["Car_Model"] if "Car_Model" in df else None,
+                                   template="plotly_dark")
         # Add trendline
-        try:
-            m, b = np.polyfit(plot_df["Engine_Num"], plot_df["Mileage_Num"], 1)
-            fig.add_trace(go.Scatter(x=plot_df["Engine_Num"], y=m*plot_df["Engine_Num"]+b,
-                                     mode="lines", line=dict(color="red"), name="Trendline"))
-        except Exception:
-            pass
+        trend = scatter_plot.trendline(df, "Engine_Num", "Mileage_Num")
+        if trend is not None:
+            fig.add_trace(trend)
         fig.update_layout(xaxis_title="Engine (CC)", yaxis_title="Mileage (kmpl)")
         st.plotly_chart(fig, use_container_width=True)
 
     # ===== Brand Frequency =====
     if "Manufactured_By" in df.columns:
         st.markdown("## 🏷️ Brand Frequency")
-        brand_counts = df["Manufactured_By"].value_counts().reset_index()
+        brand_counts = cube.counts("brand").reset_index()
         brand_counts.columns = ["Brand", "Count"]
         fig = px.bar(brand_counts.head(20), x="Brand", y="Count", template="plotly_dark")
         st.plotly_chart(fig, use_container_width=True)
@@ -184,16 +198,16 @@ def app():
         st.markdown("### 🔝 Top Brand Logos")
         cols = st.columns(5)
         for i, b in enumerate(brand_counts["Brand"].head(10)):
-            logo_path = f"car_logos/{b.lower()}.png"
+            logo_path = car_assets.logo_path(b)
             with cols[i % 5]:
-                if os.path.exists(logo_path):
+                if logo_path:
                     st.image(logo_path, width=80)
                 st.markdown(f"**{b}**")
 
     # ===== Top Models + Images =====
     if "Car_Model" in df.columns:
         st.markdown("## 🚗 Top 20 Car Models")
-        model_counts = df["Car_Model"].value_counts().head(20).reset_index()
+        model_counts = cube.counts("model").head(20).reset_index()
         model_counts.columns = ["Model", "Count"]
         fig = px.bar(model_counts, x="Model", y="Count", template="plotly_dark")
         st.plotly_chart(fig, use_container_width=True)
@@ -201,20 +215,18 @@ def app():
         # Top 5 Model Images
         st.markdown("### 🖼️ Top 5 Popular Models")
         top5_models = model_counts.head(5)
+        # Most common brand per model (ties go to the first brand alphabetically, like mode())
+        brand_of = (cube.table("brand", "model")["count"].reset_index()
+                    .sort_values("count", ascending=False, kind="stable")
+                    .drop_duplicates("model").set_index("model")["brand"])
 
         cols = st.columns(min(len(top5_models), 5))
         for idx, row in enumerate(top5_models.itertuples()):
             model = row.Model
             count = row.Count
-            brand = df[df["Car_Model"] == model]["Manufactured_By"].mode()[0] if "Manufactured_By" in df.columns else ""
+            brand = brand_of.get(model, "") if "Manufactured_By" in df.columns else ""
 
-            model_filename = f"{brand.strip().lower()}_{model.strip().lower().replace(' ', '_')}" if brand else model.strip().lower().replace(" ", "_")
-            img_path = None
-            for ext in [".jpg", ".png", ".webp"]:
-                path = f"car_images/{model_filename}{ext}"
-                if os.path.exists(path):
-                    img_path = path
-                    break
+            img_path = car_assets.image_path(brand, model)
 
             with cols[idx % len(cols)]:
                 if img_path:
@@ -232,8 +244,9 @@ def app():
     if "Selling_Price" in df.columns and "Car_Model" in df.columns:
         st.markdown("## 🏆 Top 5 High Value Cars")
 
-        top_selling = (df.groupby(["Manufactured_By", "Car_Model"])["Selling_Price"]
-                       .mean().reset_index()
+        top_selling = (cube.table("brand", "model")["selling_price_mean"]
+                       .rename("Selling_Price").rename_axis(["Manufactured_By", "Car_Model"])
+                       .reset_index()
                        .sort_values(by="Selling_Price", ascending=False)
                        .head(5))
 
@@ -243,13 +256,7 @@ def app():
             model = row.Car_Model
             price = row.Selling_Price
 
-            model_filename = f"{brand.strip().lower()}_{model.strip().lower().replace(' ', '_')}"
-            img_path = None
-            for ext in [".jpg", ".png", ".webp"]:
-                path = f"car_images/{model_filename}{ext}"
-                if os.path.exists(path):
-                    img_path = path
-                    break
+            img_path = car_assets.image_path(brand, model)
 
             with cols[idx % len(cols)]:
                 if img_path:
@@ -1,9 +1,13 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-import os, base64
+import car_assets
+import comparison_stats
+import data_store
+
+MAX_COMPARE = 12
+PER_ROW = 4  # cars shown side by side in the picture grid
 
 def app():
     # ===== Hero Header =====
@@ -21,16 +25,7 @@ def app():
     )
 
     # ===== Load Data =====
-    @st.cache_data
-    def load_data():
-        df = pd.read_csv("car_dataset.csv")
-        df.columns = df.columns.str.strip().str.lower()
-        numeric_cols = ['vehicle_age','km_driven','mileage','engine','max_power','seats','selling_price']
-        for col in numeric_cols:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        return df.dropna(subset=['brand','model'])
-
-    df = load_data()
+    df = data_store.load_listings()
     if df.empty:
         st.error("❌ Dataset not loaded or empty")
         return
@@ -46,71 +41,50 @@ def app():
     )
     col_filter1, col_filter2, col_filter3 = st.columns(3)
     with col_filter1:
-        fuel_filter = st.multiselect("Fuel Type", sorted(df['fuel_type'].dropna().unique()), default=df['fuel_type'].unique())
+        fuel_filter = st.multiselect("Fuel Type", sorted(df['fuel_type'].dropna().unique()), default=list(df['fuel_type'].dropna().unique()))
     with col_filter2:
-        trans_filter = st.multiselect("Transmission", sorted(df['transmission'].dropna().unique()), default=df['transmission'].unique())
+        trans_filter = st.multiselect("Transmission", sorted(df['transmission'].dropna().unique()), default=list(df['transmission'].dropna().unique()))
     with col_filter3:
         year_filter = st.slider("Manufactured Year", int(df['vehicle_age'].max()*-1 + 2025), 2024, (2000, 2024))
 
-    # Apply filters
-    filtered_df = df[
-        (df['fuel_type'].isin(fuel_filter)) &
-        (df['transmission'].isin(trans_filter)) &
-        ((2025 - df['vehicle_age']).between(year_filter[0], year_filter[1]))
-    ]
-    if filtered_df.empty:
+    # Apply filters: one grouped statistics table per filter combination, memoized
+    stats = comparison_stats.model_stats(fuel_filter, trans_filter, year_filter)
+    if stats.empty:
         st.warning("⚠️ No cars match the selected filters")
         return
 
     # ===== Select Models to Compare =====
     st.markdown("## 🚗 Select Models to Compare")
-    brands = sorted(filtered_df['brand'].unique())
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        brand1 = st.selectbox("Brand 1", brands)
-        model1 = st.selectbox("Model 1", sorted(filtered_df[filtered_df['brand']==brand1]['model'].unique()))
-    with col2:
-        brand2 = st.selectbox("Brand 2", brands, index=min(1,len(brands)-1))
-        model2 = st.selectbox("Model 2", sorted(filtered_df[filtered_df['brand']==brand2]['model'].unique()))
-    with col3:
-        brand3 = st.selectbox("Brand 3 (Optional)", ["None"] + brands)
-        if brand3 != "None":
-            model3 = st.selectbox("Model 3", ["None"] + sorted(filtered_df[filtered_df['brand']==brand3]['model'].unique()))
-        else:
-            model3 = None
+    choices = {f"{brand} {model}": (brand, model) for brand, model in stats.table.index}
+    default = [f"{brand} {stats.models(brand)[0]}" for brand in stats.brands()[:2]]
+    selected = st.multiselect(
+        f"Models to compare (up to {MAX_COMPARE})", list(choices),
+        default=default, max_selections=MAX_COMPARE,
+    )
 
     compare_btn = st.button("🔍 Compare Models", type="primary")
 
     # ===== Comparison Section =====
     if compare_btn:
-        models_to_compare = []
-        for brand, model in [(brand1, model1), (brand2, model2)]:
-            data = filtered_df[(filtered_df['brand']==brand) & (filtered_df['model']==model)]
-            if not data.empty:
-                models_to_compare.append((brand, model, data))
-        if model3 and model3 != "None":
-            data = filtered_df[(filtered_df['brand']==brand3) & (filtered_df['model']==model3)]
-            if not data.empty:
-                models_to_compare.append((brand3, model3, data))
-
-        if not models_to_compare:
+        summary = stats.lookup([choices[label] for label in selected])
+        models_to_compare = list(summary.index)
+
+        if summary.empty:
             st.warning("⚠️ No data available for selected models")
             return
 
         # ===== Show Logos & Images for Each Model =====
         st.markdown("### 🖼️ Selected Cars")
-        cols = st.columns(len(models_to_compare))
-        for idx, (brand, model, data) in enumerate(models_to_compare):
-            logo_path = f"car_logos/{brand.lower()}.png"
+        for idx, (brand, model) in enumerate(models_to_compare):
+            if idx % PER_ROW == 0:
+                cols = st.columns(min(PER_ROW, len(models_to_compare) - idx))
+            logo_path = car_assets.logo_path(brand)
             car_img = ""
-            model_filename = f"{brand.strip().lower()}_{model.strip().lower().replace(' ', '_')}"
-            for ext in [".jpg", ".png", ".webp"]:
-                img_path = f"car_images/{model_filename}{ext}"
-                if os.path.exists(img_path):
-                    car_img = f'<img src="data:image/{ext[1:]};base64,{base64.b64encode(open(img_path,"rb").read()).decode()}" style="max-width:200px; border-radius:10px; box-shadow:0 2px 10px rgba(0,0,0,0.5);"/>'
-                    break
-            with cols[idx]:
-                if os.path.exists(logo_path):
+            img_uri = car_assets.image_uri(brand, model)
+            if img_uri:
+                car_img = f'<img src="{img_uri}" style="max-width:200px; border-radius:10px; box-shadow:0 2px 10px rgba(0,0,0,0.5);"/>'
+            with cols[idx % PER_ROW]:
+                if logo_path:
                     st.image(logo_path, width=80)
                 st.markdown(f"### {brand} {model}")
                 if car_img:
@@ -122,12 +96,11 @@ def app():
         labels = ["Engine (CC)", "Mileage (kmpl)", "Seats", "Age (yrs)"]
 
         # --- Build grouped bar chart data ---
-        spec_data = []
-        for brand, model, data in models_to_compare:
-            avg_values = [data[f].mean() for f in spec_features]
-            for l, v in zip(labels, avg_values):
-                spec_data.append({"Model": f"{brand} {model}", "Spec": l, "Value": v})
-        spec_df = pd.DataFrame(spec_data)
+        spec_means = summary[[f"{f}_mean" for f in spec_features]]
+        spec_means.index = [f"{brand} {model}" for brand, model in spec_means.index]
+        spec_means.columns = labels
+        spec_df = (spec_means.rename_axis("Model").reset_index()
+                   .melt(id_vars="Model", var_name="Spec", value_name="Value"))
 
         # --- Grouped Bar Chart ---
         bar_fig = px.bar(
@@ -144,15 +117,7 @@ def app():
 
         # --- Heatmap Style Comparison Table ---
         st.markdown("### 🔥 Specs Heatmap Table")
-        heatmap_df = pd.DataFrame({
-            f"{brand} {model}": [
-                round(data['engine'].mean(),1),
-                round(data['mileage'].mean(),1),
-                round(data['seats'].mean(),1),
-                round(data['vehicle_age'].mean(),1)
-            ]
-            for brand, model, data in models_to_compare
-        }, index=labels)
+        heatmap_df = spec_means.T.round(1)
 
         def color_scale(val, col_name):
             """Green for higher is better, red for lower (except Age, where lower is better)."""
@@ -176,9 +141,9 @@ def app():
         # ===== Price Distribution =====
         st.markdown("### 💰 Price Distribution")
         box_fig = go.Figure()
-        for brand, model, data in models_to_compare:
+        for brand, model in models_to_compare:
             box_fig.add_trace(go.Box(
-                y=data['selling_price'],
+                y=stats.listings(df, brand, model)['selling_price'],
                 name=f"{brand} {model}"
             ))
         box_fig.update_layout(yaxis_title="Price (₹)", template="plotly_dark")
@@ -186,32 +151,26 @@ def app():
 
         # ===== Detailed Comparison Table =====
         st.markdown("### 📋 Detailed Comparison Table")
-        table_data = []
-        for brand, model, data in models_to_compare:
-            avg_price = data['selling_price'].mean()
-            min_price = data['selling_price'].min()
-            max_price = data['selling_price'].max()
-            price_per_km = (avg_price / data['km_driven'].mean()) if data['km_driven'].mean() else np.nan
-            depreciation = 100*(1 - (avg_price / max_price)) if max_price else 0
-            table_data.append({
-                "Model": f"{brand} {model}",
-                "Avg Price (₹)": round(avg_price, 2),
-                "Min Price (₹)": round(min_price, 2),
-                "Max Price (₹)": round(max_price, 2),
-                "Price per km (₹)": round(price_per_km, 4) if not np.isnan(price_per_km) else "N/A",
-                "Depreciation %": round(depreciation, 2),
-                "Avg Mileage (kmpl)": round(data['mileage'].mean(), 2),
-                "Avg Engine (cc)": round(data['engine'].mean(), 2),
-                "Avg Seats": round(data['seats'].mean(), 1),
-                "Avg Age (yrs)": round(data['vehicle_age'].mean(), 1)
-            })
-        st.dataframe(pd.DataFrame(table_data).set_index("Model"), use_container_width=True)
+        table_df = pd.DataFrame({
+            "Avg Price (₹)": summary['selling_price_mean'].round(2),
+            "Min Price (₹)": summary['selling_price_min'].round(2),
+            "Max Price (₹)": summary['selling_price_max'].round(2),
+            "Price per km (₹)": summary['price_per_km'].round(4).astype(object).where(summary['price_per_km'].notna(), "N/A"),
+            "Depreciation %": summary['depreciation'].round(2),
+            "Avg Mileage (kmpl)": summary['mileage_mean'].round(2),
+            "Avg Engine (cc)": summary['engine_mean'].round(2),
+            "Avg Seats": summary['seats_mean'].round(1),
+            "Avg Age (yrs)": summary['vehicle_age_mean'].round(1)
+        })
+        table_df.index = pd.Index([f"{brand} {model}" for brand, model in summary.index], name="Model")
+        st.dataframe(table_df, use_container_width=True)
 
         # ===== Scatter: Price vs Mileage =====
         st.markdown("### 🚀 Price vs Mileage")
         scatter_fig = go.Figure()
         colors = px.colors.qualitative.Plotly
-        for i, (brand, model, data) in enumerate(models_to_compare):
+        for i, (brand, model) in enumerate(models_to_compare):
+            data = stats.listings(df, brand, model)
             scatter_fig.add_trace(go.Scatter(
                 x=data['mileage'],
                 y=data['selling_price'],
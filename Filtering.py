@@ -1,18 +1,15 @@
 import streamlit as st
-import pandas as pd
-import os
-import plotly.express as px
+import car_assets
+import data_store
+import filter_index
+import scatter_plot
 
-def app():
-    @st.cache_data
-    def load_data():
-        df = pd.read_csv("car_dataset.csv")
-        df = df.loc[:, ~df.columns.duplicated(keep='first')]
-        df.drop(columns=[col for col in df.columns if col.lower().startswith("unnamed")], inplace=True, errors="ignore")
-        df.columns = df.columns.str.strip().str.lower()
-        return df
+PAGE_SIZES = [25, 50, 100, 250]
 
-    df = load_data()
+def app():
+    df = data_store.load_listings()
+    index = filter_index.load_filter_index()
+    catalog = data_store.load_catalog()
 
     # ===== Hero Header =====
     st.markdown(
@@ -35,53 +32,43 @@ def app():
     # ===== Filters =====
     with st.expander("🔎 Filter Options", expanded=True):
         # Brand filter
-        selected_brands = st.multiselect("1️⃣ Select Car Name (Brand)", sorted(df["brand"].dropna().unique()))
+        selected_brands = st.multiselect("1️⃣ Select Car Name (Brand)", index.values("brand"))
 
         # Model filter (dependent on brand)
         if selected_brands:
-            available_models = sorted(df[df["brand"].isin(selected_brands)]["model"].dropna().unique())
+            available_models = sorted({m for b in selected_brands for m in catalog["models_by_brand"].get(b, [])})
             selected_models = st.multiselect("2️⃣ Select Car Model", available_models)
         else:
             st.info("ℹ️ Please select at least one brand to view models.")
             selected_models = []
 
         # Fuel filter
-        fuel = st.multiselect("3️⃣ Select Fuel Type", sorted(df["fuel_type"].dropna().unique())) if "fuel_type" in df else []
+        fuel = st.multiselect("3️⃣ Select Fuel Type", index.values("fuel_type")) if "fuel_type" in df else []
 
         # Transmission filter
-        transmission = st.multiselect("4️⃣ Select Transmission", sorted(df["transmission"].dropna().unique())) if "transmission" in df else []
+        transmission = st.multiselect("4️⃣ Select Transmission", index.values("transmission")) if "transmission" in df else []
 
         # Year filter
-        if "year" in df.columns:
-            min_year = int(df["year"].min())
-            max_year = int(df["year"].max())
+        if index.bounds("year"):
+            min_year, max_year = (int(y) for y in index.bounds("year"))
             year_range = st.slider("5️⃣ Select Year Range", min_year, max_year, (min_year, max_year))
         else:
             year_range = None
 
     # ===== Apply Filters =====
-    filtered_df = df.copy()
-    if selected_brands:
-        filtered_df = filtered_df[filtered_df["brand"].isin(selected_brands)]
-    if selected_models:
-        filtered_df = filtered_df[filtered_df["model"].isin(selected_models)]
-    if fuel:
-        filtered_df = filtered_df[filtered_df["fuel_type"].isin(fuel)]
-    if transmission:
-        filtered_df = filtered_df[filtered_df["transmission"].isin(transmission)]
-    if year_range and "year" in filtered_df.columns:
-        filtered_df = filtered_df[
-            (filtered_df["year"] >= year_range[0]) & (filtered_df["year"] <= year_range[1])
-        ]
-    filtered_df = filtered_df.loc[:, ~filtered_df.columns.duplicated(keep='first')]
+    matches = index.query(
+        {"brand": selected_brands, "model": selected_models, "fuel_type": fuel, "transmission": transmission},
+        {"year": year_range} if year_range else None,
+    )
+    n_matches = index.count(matches)
 
     # ===== Show Logos for Brands =====
     if selected_brands:
         st.markdown("### 🏷️ Selected Brands")
         cols = st.columns(len(selected_brands))
         for i, b in enumerate(selected_brands):
-            logo_path = f"car_logos/{b.lower()}.png"
-            if os.path.exists(logo_path):
+            logo_path = car_assets.logo_path(b)
+            if logo_path:
                 cols[i].image(logo_path, width=80)
             cols[i].markdown(f"**{b}**")
 
@@ -90,39 +77,53 @@ def app():
         st.markdown("### 🖼️ Selected Models")
         cols = st.columns(len(selected_models))
         for i, m in enumerate(selected_models):
-            model_filename = f"{selected_brands[0].lower()}_{m.lower().replace(' ', '_')}"
-            for ext in [".jpg", ".png", ".webp"]:
-                path = f"car_images/{model_filename}{ext}"
-                if os.path.exists(path):
-                    cols[i].image(path, width=180, caption=m)
-                    break
+            path = car_assets.image_path(selected_brands[0], m)
+            if path:
+                cols[i].image(path, width=180, caption=m)
 
     # ===== Summary Stats =====
-    if not filtered_df.empty:
-        avg_price = filtered_df["selling_price"].mean() if "selling_price" in filtered_df else None
-        avg_mileage = filtered_df["mileage"].mean() if "mileage" in filtered_df else None
+    if n_matches:
+        avg_price = index.mean("selling_price", matches)
+        avg_mileage = index.mean("mileage", matches)
 
         st.markdown("### 📊 Summary Stats")
         colA, colB, colC = st.columns(3)
-        colA.metric("🚘 Cars Found", len(filtered_df))
+        colA.metric("🚘 Cars Found", n_matches)
         if avg_price: colB.metric("💰 Avg Price", f"₹ {avg_price:,.0f}")
         if avg_mileage: colC.metric("🌱 Avg Mileage", f"{avg_mileage:.1f} kmpl")
 
     # ===== Results Table =====
     st.markdown("### 📋 Filtered Car Results")
-    st.write(f"🔢 Total Matching Records: `{len(filtered_df)}`")
-
-    if not filtered_df.empty:
-        styled = filtered_df.style.set_properties(**{
+    st.write(f"🔢 Total Matching Records: `{n_matches}`")
+
+    if n_matches:
+        # Only the visible page is sorted, styled and sent to the browser
+        sort_options = ["(dataset order)"] + [c for c in df.columns if c in index.orders]
+        colS, colD, colP, colN = st.columns([3, 2, 2, 2])
+        sort_by = colS.selectbox("Sort by", sort_options)
+        descending = colD.radio("Order", ["Ascending", "Descending"], horizontal=True) == "Descending"
+        page_size = colP.selectbox("Rows per page", PAGE_SIZES, index=1)
+        n_pages = -(-n_matches // page_size)
+        page = colN.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1)
+
+        start = (int(page) - 1) * page_size
+        page_df = index.take(
+            df, matches, by=None if sort_by == sort_options[0] else sort_by,
+            ascending=not descending, start=start, stop=start + page_size,
+        )
+        st.caption(f"Showing rows {start + 1:,}–{start + len(page_df):,} of {n_matches:,}")
+        styled = page_df.style.set_properties(**{
             "background-color":"rgba(255,255,255,0.03)",
             "color":"white"
         })
-        st.dataframe(styled, use_container_width=True, height=800)
+        st.dataframe(styled, use_container_width=True, height=min(800, 38 + 35 * len(page_df)))
 
     # ===== Visualization =====
-    if not filtered_df.empty and "selling_price" in filtered_df and "year" in filtered_df:
+    if n_matches and "selling_price" in df and "year" in df:
+        plot_cols = [c for c in ["year", "selling_price", "brand", "model", "fuel_type", "transmission"] if c in df]
+        filtered_df = index.take(df[plot_cols], matches)
         st.markdown("### 📈 Price vs Year")
-        fig = px.scatter(
+        fig = scatter_plot.scatter(
             filtered_df,
             x="year",
             y="selling_price",
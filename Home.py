@@ -1,13 +1,10 @@
 import streamlit as st
-import base64
-from pathlib import Path
-import time
-import itertools
+import static_assets
+import data_store
 
 def app():
     # === Load background image ===
-    img_path = "assets/263800.jpg"
-    encoded = base64.b64encode(Path(img_path).read_bytes()).decode()
+    bg_url = static_assets.asset_url(static_assets.BACKGROUND)
 
     # === Custom CSS ===
     st.markdown(
@@ -19,7 +16,7 @@ def app():
             position: fixed;
             inset: 0;
             background: linear-gradient(rgba(0,0,0,0.6), rgba(0,0,40,0.8)), 
-                        url("data:image/jpg;base64,{encoded}") center/cover no-repeat;
+                        url("{bg_url}") center/cover no-repeat;
             z-index: -1;
         }}
 
@@ -80,6 +77,22 @@ def app():
         .stat-num {{
             font-size: 40px; font-weight: 900;
         }}
+        /* Count-up runs in the browser; without @property support the final number shows */
+        @property --num {{
+            syntax: '<integer>';
+            initial-value: 0;
+            inherits: false;
+        }}
+        .stat-num.count {{
+            counter-reset: num var(--num);
+            animation: count-up 1.2s ease-out;
+        }}
+        .stat-num.count::after {{
+            content: counter(num) "+";
+        }}
+        @keyframes count-up {{
+            from {{ --num: 0; }}
+        }}
         .stat-desc {{
             font-size: 16px; font-weight: 600;
         }}
@@ -131,28 +144,30 @@ def app():
     )
 
     # === Stats with Animated Counters ===
+    try:
+        df = data_store.load_listings()
+        catalog = data_store.load_catalog()
+        stats = [("📊", len(df), "Car Records"),
+                 ("🚘", len(catalog["brands"]), "Brands"),
+                 ("⚡", df["fuel_type"].nunique(), "Fuel Types"),
+                 ("🏷️", len(catalog["models"]), "Models")]
+    except Exception:
+        stats = []
+
     st.markdown('<div class="stats-container">', unsafe_allow_html=True)
-    cols = st.columns(4)
-    stats = [("📊", 15000, "Car Records"),
-             ("🚘", 30, "Brands"),
-             ("⚡", 6, "Fuel Types"),
-             ("🏷️", 200, "Models")]
-    for col, (icon, num, desc) in zip(cols, stats):
-        with col:
-            # animated counter
-            placeholder = st.empty()
-            for i in range(0, num+1, max(1, num//20)):
-                placeholder.markdown(
-                    f"""
-                    <div class="stat-card">
-                        <div style="font-size:45px">{icon}</div>
-                        <div class="stat-num">{i}+</div>
-                        <div class="stat-desc">{desc}</div>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-                time.sleep(0.02)
+    if stats:
+        cols = st.columns(len(stats))
+        for col, (icon, num, desc) in zip(cols, stats):
+            col.markdown(
+                f"""
+                <div class="stat-card">
+                    <div style="font-size:45px">{icon}</div>
+                    <div class="stat-num count" style="--num:{num}"></div>
+                    <div class="stat-desc">{desc}</div>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
     st.markdown('</div>', unsafe_allow_html=True)
          # === About the Project ===
     st.markdown(
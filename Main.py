@@ -1,21 +1,19 @@
 import streamlit as st
-import base64
-import Home, Filtering, Analysis, Prediction, Comparison
+import static_assets
+import importlib
 
 # ===== Page Config =====
 st.set_page_config(page_title="CarDekho Resale Price Predictor", layout="wide")
 
 # ===== Function to set background and sidebar styling =====
 def set_bg_image(image_file):
-    with open(image_file, "rb") as f:
-        data = f.read()
-    encoded = base64.b64encode(data).decode()
+    bg_url = static_assets.asset_url(image_file)
 
     css = f"""
     <style>
     /* ===== Main Background ===== */
     .stApp {{
-        background: url("data:image/jpg;base64,{encoded}") no-repeat center center fixed;
+        background: url("{bg_url}") no-repeat center center fixed;
         background-size: cover;
     }}
 
@@ -83,7 +81,7 @@ def set_bg_image(image_file):
     st.markdown(css, unsafe_allow_html=True)
 
 # ===== Apply background =====
-set_bg_image("assets/263800.jpg")
+set_bg_image(static_assets.BACKGROUND)
 
 # ===== Sidebar Branding =====
 st.sidebar.markdown(
@@ -95,10 +93,19 @@ st.sidebar.markdown(
     unsafe_allow_html=True
 )
 
+# ===== Pages (module imported on first visit, with its plotly/sklearn deps) =====
+PAGES = {
+    "🏠 Home": "Home",
+    "🔍 Data Filtering": "Filtering",
+    "📊 Data Analysis": "Analysis",
+    "💰 Price Prediction": "Prediction",
+    "📉 Price Comparison": "Comparison",
+}
+
 # ===== Sidebar Menu =====
 menu = st.sidebar.radio(
     "",
-    ["🏠 Home", "🔍 Data Filtering", "📊 Data Analysis", "💰 Price Prediction", "📉 Price Comparison"],
+    list(PAGES),
     key="menu",
 )
 
@@ -108,16 +115,8 @@ if "go_to" in st.session_state:
     del st.session_state["go_to"]
 
 # ===== Page Loader =====
-if menu == "🏠 Home":
-    Home.app()
-elif menu == "🔍 Data Filtering":
-    Filtering.app()
-elif menu == "📊 Data Analysis":
-    Analysis.app()
-elif menu == "💰 Price Prediction":
-    Prediction.app()
-elif menu == "📉 Price Comparison":
-    Comparison.app()
+if menu in PAGES:
+    importlib.import_module(PAGES[menu]).app()
 
 # ===== Sidebar Footer =====
 st.sidebar.markdown("---")
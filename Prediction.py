@@ -1,10 +1,10 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import joblib
-from datetime import datetime
-import os
-import base64
+import car_assets
+import flat_model
+import data_store
+import model_registry
+import pricing
 
 def app():
     # ===== Hero Section =====
@@ -29,31 +29,66 @@ def app():
 
     # ===== Load model & encoders =====
     try:
-        model = joblib.load("GradientBoost_model.pkl")
-        encoders = joblib.load("label_encoders.pkl")
+        flat_model.get_flat_model()
+        encoders = pricing.get_encoder_tables()
     except Exception as e:
         st.error(f"❌ Failed to load model/encoders: {e}")
         return
 
+    # ===== Bulk Pricing (CSV) =====
+    with st.expander("📦 Bulk Pricing (CSV upload)"):
+        st.caption(
+            "Columns: brand, model, fuel_type, transmission, km_driven, engine, mileage, seats "
+            "and vehicle_age (or year)."
+        )
+        uploaded = st.file_uploader("Upload inventory CSV", type=["csv"])
+        if uploaded is not None:
+            try:
+                # Price each upload once; reruns from other widgets reuse the result
+                key = (uploaded.file_id,
+                       model_registry.version(model_registry.MODEL_PATH, flat_model.load_flat_model),
+                       model_registry.version(model_registry.ENCODERS_PATH, pricing.load_encoder_tables))
+                bulk = st.session_state.get("bulk_pricing")
+                if bulk is None or bulk[0] != key:
+                    parts, n_cars, n_flagged, n_missing = [], 0, 0, 0
+                    with st.spinner("Pricing inventory..."):
+                        for priced in pricing.iter_priced_chunks(uploaded):
+                            parts.append(pricing.chunk_to_csv(priced, header=not parts))
+                            n_cars += len(priced)
+                            n_flagged += int(priced["year_before_launch"].sum())
+                            n_missing += int(priced["missing_fields"].sum())
+                    bulk = (key, "".join(parts), n_cars, n_flagged, n_missing)
+                    st.session_state["bulk_pricing"] = bulk
+                _, priced_csv, n_cars, n_flagged, n_missing = bulk
+                st.success(f"✅ Priced {n_cars - n_missing:,} cars")
+                if n_missing:
+                    st.warning(f"⚠️ {n_missing:,} cars were not priced: a numeric field is missing or not a number "
+                               "(see the `missing_fields` column).")
+                if n_flagged:
+                    st.warning(f"⚠️ {n_flagged:,} cars have a manufacture year before the model's launch "
+                               "(see the `year_before_launch` column).")
+                st.download_button(
+                    "⬇️ Download priced CSV",
+                    priced_csv,
+                    file_name=f"priced_{uploaded.name}",
+                    mime="text/csv",
+                    use_container_width=True,
+                )
+            except Exception as e:
+                st.error(f"❌ Bulk pricing failed: {e}")
+
     # ===== Load dataset =====
     try:
-        df = pd.read_csv("car_dataset.csv")
-        df.columns = df.columns.str.strip().str.lower()
+        catalog = data_store.load_catalog()
     except Exception as e:
         st.error(f"❌ Could not load 'car_dataset.csv': {e}")
         return
 
-    # ===== Hardcoded launch years =====
-    launch_data = [
-        ("Maruti","Ciaz",2014),("Maruti","Baleno",2015),("Maruti","Celerio",2014),
-        ("Hyundai","i20",2008),("Honda","City",2003),("Tata","Nexon",2017),
-        # ...(keep the rest of your list here as before)
-    ]
-    inferred_launch = {
-        (b.strip().lower(), m.strip().lower()): int(y)
-        for b, m, y in launch_data
-        if b and m and y is not None
-    }
+    # ===== Launch years =====
+    try:
+        inferred_launch = data_store.load_launch_years()
+    except Exception:
+        inferred_launch = {}
 
     # ===== Input Form =====
     st.markdown(
@@ -70,10 +105,10 @@ def app():
     )
 
     # Brand & Model
-    brands = sorted(df['brand'].dropna().unique())
-    all_models = sorted(df['model'].dropna().unique())
+    brands = catalog["brands"]
+    all_models = catalog["models"]
     brand = st.selectbox("🚘 Select Brand", ["None"] + brands)
-    models = sorted(df[df['brand'] == brand]['model'].dropna().unique()) if brand != "None" else all_models
+    models = catalog["models_by_brand"].get(brand, []) if brand != "None" else all_models
     car_model = st.selectbox("🚗 Select Model", ["None"] + models)
 
     # Year
@@ -88,15 +123,13 @@ def app():
         manufacture_year = int(manufacture_year)
 
     # Car age calculation
-    current_year = MAX_YEAR
-    vehicle_age = min(max(0, current_year - manufacture_year), 15)
+    vehicle_age = int(pricing.vehicle_age_from_year(manufacture_year))
     st.markdown(f"🧮 **Car Age:** `{vehicle_age}` years")
 
     # ===== Check launch year =====
     try:
         if brand != "None" and car_model != "None":
-            key = (brand.strip().lower(), car_model.strip().lower())
-            launch_year = inferred_launch.get(key, None)
+            launch_year = inferred_launch.get(data_store.launch_key(brand, car_model), None)
             if launch_year is not None and manufacture_year < launch_year:
                 st.error(f"⚠️ {brand} {car_model} was first manufactured in {launch_year}. You selected {manufacture_year}.")
     except Exception:
@@ -106,12 +139,10 @@ def app():
     default_engine = 1200
     default_mileage = 18.0
     if brand != "None" and car_model != "None":
-        subset = df[(df['brand'].str.lower() == brand.lower()) & (df['model'].str.lower() == car_model.lower())]
-        if not subset.empty:
-            if "engine" in subset.columns:
-                default_engine = int(subset['engine'].mean(skipna=True)) if not subset['engine'].isna().all() else default_engine
-            if "mileage" in subset.columns:
-                default_mileage = round(subset['mileage'].mean(skipna=True), 1) if not subset['mileage'].isna().all() else default_mileage
+        spec = catalog["specs"].get((brand.lower(), car_model.lower()))
+        if spec:
+            default_engine = int(spec["engine"]) if pd.notna(spec["engine"]) else default_engine
+            default_mileage = round(spec["mileage"], 1) if pd.notna(spec["mileage"]) else default_mileage
 
     # Fuel & Transmission
     fuel = st.selectbox("⛽ Fuel Type", ["Petrol","Diesel","CNG","Electric"])
@@ -134,26 +165,15 @@ def app():
             st.warning("⚠️ Please select all required fields.")
             return
         try:
-            X_input = [
-                km_driven,
-                encoders['transmission'].transform([trans])[0] if trans in encoders['transmission'].classes_ else -1,
-                encoders['model'].transform([car_model])[0] if car_model in encoders['model'].classes_ else -1,
-                vehicle_age,
-                engine,
-                mileage,
-                encoders['fuel_type'].transform([fuel])[0] if fuel in encoders['fuel_type'].classes_ else -1,
-                seats,
-                encoders['brand'].transform([brand])[0] if brand in encoders['brand'].classes_ else -1
-            ]
-
-            log_price = model.predict([X_input])[0]
-
-            if vehicle_age == 0: log_price += 0.02
-            elif vehicle_age == 1: log_price += 0.01
-
-            final_price = np.exp(log_price)
-            lower_range = final_price * 0.95
-            upper_range = final_price * 1.05
+            car = {
+                "km_driven": km_driven, "transmission": trans, "model": car_model,
+                "vehicle_age": vehicle_age, "engine": engine, "mileage": mileage,
+                "fuel_type": fuel, "seats": seats, "brand": brand,
+            }
+            priced = pricing.predict_price(car, tables=encoders)
+            final_price = priced["predicted_price"]
+            lower_range = priced["lower_range"]
+            upper_range = priced["upper_range"]
 
             # Predicted Price Card
             st.markdown(
@@ -186,12 +206,9 @@ def app():
 
             # Car Summary
             img_html = ""
-            model_filename = f"{brand.strip().lower()}_{car_model.strip().lower().replace(' ', '_')}"
-            for ext in [".jpg", ".png", ".webp"]:
-                path = f"car_images/{model_filename}{ext}"
-                if os.path.exists(path):
-                    img_html = f'<img src="data:image/{ext[1:]};base64,{base64.b64encode(open(path,"rb").read()).decode()}" style="max-width:250px; border-radius:12px; box-shadow:0 2px 10px rgba(0,0,0,0.5);"/>'
-                    break
+            img_uri = car_assets.image_uri(brand, car_model)
+            if img_uri:
+                img_html = f'<img src="{img_uri}" style="max-width:250px; border-radius:12px; box-shadow:0 2px 10px rgba(0,0,0,0.5);"/>'
 
             st.markdown(
                 f"""
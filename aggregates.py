@@ -0,0 +1,222 @@
+"""Precomputed aggregates of the listings for the Analysis page.
+
+The page's charts only need per-group figures -- listings per fuel type, mean
+price per brand/model, and so on -- so they are computed once per dataset
+version instead of re-scanning the rows on every rerun. Each rollup in
+``ROLLUPS`` is a table indexed by its group keys with a ``count`` column and,
+per measure, ``n`` (non-missing values), ``sum``, ``mean``, ``min``, ``max``
+and the ``q25``/``median``/``q75`` quantiles. ``count``, ``n``, ``sum``,
+``min`` and ``max`` are merged with those of new listings when they arrive and
+the mean follows from ``sum / n``. Quantiles are read off each group's value
+counts (rows per distinct value), which the cube keeps and which merge just as
+exactly. So ``from_chunks`` builds the cube from a file too large for memory,
+and ``append`` aggregates only the new listings: its cost grows with them and
+with the number of distinct (group, value) pairs, not with the history's rows.
+
+The cube is pickled under ``.cache/`` keyed by the dataset's content hash, so
+a new process reads it back instead of rebuilding it.
+"""
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+import data_store
+import model_registry
+
+CUBE_VERSION = 2  # bump when the layout changes so old pickles are rebuilt
+MEASURES = ["selling_price", "km_driven", "mileage", "engine", "max_power"]
+ROLLUPS = [
+    (),
+    ("brand",),
+    ("model",),
+    ("brand", "model"),
+    ("fuel_type",),
+    ("transmission",),
+    ("vehicle_age",),
+    ("year",),
+]
+QUANTILES = {"q25": 0.25, "median": 0.5, "q75": 0.75}
+
+
+def _groups(df, keys):
+    if keys:
+        return df.groupby(list(keys), observed=True, sort=True)
+    return df.groupby(np.zeros(len(df), dtype=np.int64))  # a single group holding every row
+
+
+def _stats(df, keys, measures):
+    # The mergeable figures (and the mean) per group
+    groups = _groups(df, keys)
+    columns = {"count": groups.size() if keys else pd.Series([len(df)])}
+    stats = groups[measures].agg(["count", "sum", "mean", "min", "max"])
+    for m in measures:
+        columns[f"{m}_n"] = stats[(m, "count")]
+        for stat in ("sum", "mean", "min", "max"):
+            columns[f"{m}_{stat}"] = stats[(m, stat)]
+    return pd.DataFrame(columns)
+
+
+def _value_counts(df, keys, measure):
+    # Rows per (group, non-missing measure value), sorted by group then value
+    by = [df[k] for k in keys] + [df[measure]]
+    return df.groupby(by, observed=True, sort=True).size()
+
+
+def _quantiles_from_counts(counts, measures, keys):
+    # Same interpolation as groupby.quantile, reading ranks off cumulative counts
+    columns = {}
+    for m in measures:
+        c = counts[m]
+        values = c.index.get_level_values(m).to_numpy(dtype=np.float64)
+        cum = np.cumsum(c.to_numpy())
+        groups = c.index.droplevel(m) if keys else pd.Index(np.zeros(len(c), dtype=np.int64))
+        first = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]]) if len(c) else np.empty(0, dtype=np.intp)
+        before = np.r_[0, cum][first]
+        size = np.r_[cum[first[1:] - 1], cum[-1:]] - before
+        for name, q in QUANTILES.items():
+            position = q * (size - 1)
+            lo = position.astype(np.int64)
+            low = values[np.searchsorted(cum, before + lo, side="right")]
+            high = values[np.searchsorted(cum, before + np.minimum(lo + 1, size - 1), side="right")]
+            columns[f"{m}_{name}"] = pd.Series(low + (high - low) * (position % 1), index=groups[first])
+    return pd.DataFrame(columns)
+
+
+def _merge_counts(counts, added):
+    # Rows per (group, value) of both, sorted by group then value
+    return pd.concat([counts, added]).groupby(level=list(range(added.index.nlevels)), sort=True).sum()
+
+
+def _tables(stats, counts):
+    # Rollup tables: the mergeable figures joined with quantiles from the value counts
+    tables = {}
+    for keys, table in stats.items():
+        measures = [m for m in MEASURES if (keys, m) in counts]
+        quantiles = _quantiles_from_counts({m: counts[keys, m] for m in measures}, measures, keys)
+        table = table.join(quantiles) if keys else table.join(quantiles.set_axis(table.index[:len(quantiles)]))
+        order = ["count"] + [f"{m}_{stat}" for m in measures for stat in ("n", "sum", "mean", "min", "max", *QUANTILES)]
+        tables[keys] = table[order].reset_index(drop=True) if not keys else table[order]
+    return tables
+
+
+def _merge(table, added, measures):
+    # ``table``'s mergeable figures combined with those of the new rows
+    groups = pd.concat([table[added.columns], added]).groupby(
+        level=list(range(table.index.nlevels)), observed=True, sort=True)
+    merged = pd.DataFrame({"count": groups["count"].sum()})
+    for m in measures:
+        n = merged[f"{m}_n"] = groups[f"{m}_n"].sum()
+        total = merged[f"{m}_sum"] = groups[f"{m}_sum"].sum()
+        merged[f"{m}_mean"] = total / n.where(n > 0)
+        merged[f"{m}_min"] = groups[f"{m}_min"].min()
+        merged[f"{m}_max"] = groups[f"{m}_max"].max()
+    return merged
+
+
+class AggregateCube:
+    def __init__(self, tables, value_counts):
+        self.tables = tables  # rollup keys -> table
+        self.value_counts = value_counts  # (rollup keys, measure) -> rows per (group, value)
+
+    @classmethod
+    def build(cls, df):
+        return cls.from_chunks([df])
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """``build`` over the concatenation of ``chunks``, holding one chunk at a time.
+
+        Chunks must share dtypes, as ``data_store.iter_clean`` yields them.
+        Counts, sums, minima and maxima are merged chunk by chunk, and so are
+        the per-group value counts quantiles come from, bounded by the number
+        of distinct values rather than rows.
+        """
+        stats, counts = {}, {}
+        for chunk in chunks:
+            measures = [m for m in MEASURES if m in chunk.columns]
+            for keys in ROLLUPS:
+                if not all(k in chunk.columns for k in keys):
+                    continue
+                table = _stats(chunk, keys, measures)
+                stats[keys] = _merge(stats[keys], table, measures) if keys in stats else table
+                for m in measures:
+                    c = _value_counts(chunk, keys, m)
+                    counts[keys, m] = _merge_counts(counts[keys, m], c) if (keys, m) in counts else c
+        return cls(_tables(stats, counts), counts)
+
+    def append(self, df, start):
+        """Cube of ``df``, whose first ``start`` rows are the ones aggregated here.
+
+        Only the new rows are aggregated: their figures and value counts are
+        merged into the cube's, and quantiles read off the merged counts.
+        """
+        measures = [m for m in MEASURES if m in df.columns]
+        added = df.iloc[start:]
+        stats, counts = {}, {}
+        for keys, table in self.tables.items():
+            if keys:
+                table = table.set_axis(_recode(table.index, df, keys))
+            stats[keys] = _merge(table, _stats(added, keys, measures), measures)
+            for m in measures:
+                c = self.value_counts[keys, m]
+                if keys:
+                    c = c.set_axis(_recode(c.index, df, keys + (m,)))
+                counts[keys, m] = _merge_counts(c, _value_counts(added, keys, m))
+        return AggregateCube(_tables(stats, counts), counts)
+
+    def has(self, *keys):
+        return keys in self.tables
+
+    def table(self, *keys):
+        """Aggregate table for the rollup over ``keys`` (read-only)."""
+        return self.tables[keys]
+
+    def counts(self, key):
+        """Listings per value of ``key``, most common first (like ``value_counts``)."""
+        return self.tables[(key,)]["count"].sort_values(ascending=False, kind="stable")
+
+    def total(self, measure, stat="mean"):
+        """Whole-dataset statistic of ``measure``, or None if it is not aggregated."""
+        column = f"{measure}_{stat}"
+        table = self.tables[()]
+        return table[column].iloc[0] if column in table else None
+
+
+def _recode(index, df, keys):
+    # ``index`` with its categorical levels on ``df``'s (possibly wider) categories
+    levels = []
+    for key in keys:
+        level = index.get_level_values(key)
+        if isinstance(df[key].dtype, pd.CategoricalDtype):
+            level = pd.CategoricalIndex(np.asarray(level), categories=df[key].cat.categories, name=key)
+        levels.append(level)
+    return pd.MultiIndex.from_arrays(levels) if len(levels) > 1 else levels[0]
+
+
+def _cube_path(csv_path, sha256):
+    return model_registry.cache_path(csv_path, f"aggregates.v{CUBE_VERSION}.{sha256[:16]}.pkl")
+
+
+def _load_cube(csv_path):
+    sha256 = model_registry.content_hash(csv_path)
+    path = _cube_path(csv_path, sha256)
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    cube = AggregateCube.build(data_store.load_listings(csv_path))
+    _write_cube(csv_path, sha256, cube)
+    return cube
+
+
+def _write_cube(csv_path, sha256, cube):
+    model_registry.write_cache(_cube_path(csv_path, sha256),
+                               lambda f: pickle.dump(cube, f, protocol=pickle.HIGHEST_PROTOCOL),
+                               stale=model_registry.cache_path(csv_path, "aggregates.*.pkl"))
+
+
+def load_cube(path=data_store.DATASET_PATH):
+    """Aggregate cube of the listings, built once per dataset version."""
+    return model_registry.load(path, _load_cube)
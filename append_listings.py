@@ -0,0 +1,158 @@
+"""Append a batch of new listings without reprocessing the history.
+
+Adding listings used to mean regenerating ``car_dataset.csv`` and having every
+process re-parse, re-clean and re-index all of it. ``append`` does the
+per-row work for the new rows only:
+
+1. the batch is formatted as CSV rows in the dataset's column layout and
+   parsed and cleaned on its own (``data_store.clean``); missing specs are
+   filled from the modes of the same brands' listings, old and new;
+2. the cleaned rows are concatenated onto the shared listings, merging the
+   categoricals' categories;
+3. the filter index and the aggregate cube are extended with
+   ``FilterIndex.append`` / ``AggregateCube.append`` -- new rows are
+   binary-searched into the sort orders, and only the new rows are
+   aggregated, their figures and value counts merged into the cube's;
+4. the snapshot, index and cube are written under ``.cache/`` for the new
+   content hash *before* the rows are appended to the CSV, so a process that
+   sees the new file finds them ready instead of rebuilding;
+5. the new objects are installed in ``model_registry`` for this process.
+
+Every cache keyed by the dataset version (the catalog, the Analysis frame,
+Comparison statistics) is dropped or rebuilt from the new listings on its
+next use; caches keyed by model or asset files are untouched. The result is
+the same as a full rebuild of the appended CSV, except that listings imputed
+earlier keep the values they were given then.
+
+    python append_listings.py new_listings.csv [more.csv ...]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import aggregates
+import data_store
+import filter_index
+import impute
+import model_registry
+
+
+def _layout(path):
+    """``(header line, newline, next row id, file ends with a newline)`` of the CSV."""
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - (1 << 16)))
+        tail = f.read()
+    newline = b"\r\n" if header.endswith(b"\r\n") else b"\n"
+    last = tail.rstrip(b"\r\n").rsplit(b"\n", 1)[-1]
+    try:
+        next_id = int(last.split(b",", 1)[0]) + 1
+    except ValueError:  # no row id column, or no rows yet
+        next_id = None
+    return header, newline, next_id, tail.endswith(b"\n")
+
+
+def _format_rows(batch, header, newline, next_id):
+    columns = pd.read_csv(io.BytesIO(header)).columns
+    rows = batch.reindex(columns=columns)
+    if header.startswith(b",") and next_id is not None:  # unnamed row id column, as written by to_csv
+        rows[columns[0]] = range(next_id, next_id + len(rows))
+    return rows.to_csv(header=False, index=False, lineterminator=newline.decode()).encode()
+
+
+def _fill_added(history, index, added):
+    # Impute the new rows' gaps from the same brands' listings, old and new
+    columns = [c for c in impute.LISTING_COLUMNS if c in added.columns]
+    gaps = pd.Series(False, index=added.index)
+    for col in columns:
+        gaps |= added[col].isna() | added[col].isin(impute.LISTING_COLUMNS[col])
+    if not gaps.any():
+        return added
+    keys = impute.LISTING_KEYS
+    brands = [str(b) for b in added.loc[gaps, "brand"].unique()]
+    context = history.take(index.rows(index.query({"brand": brands})))
+    both = pd.concat([context[keys + columns], added[keys + columns]], ignore_index=True)
+    filled, _ = impute.fill_group_modes(both, impute.LISTING_COLUMNS, keys)
+    added = added.copy()
+    for col in columns:
+        added[col] = filled[col].iloc[len(context):].set_axis(added.index)
+    return added
+
+
+def _combine(history, added):
+    columns = {}
+    for col in history.columns:
+        if isinstance(history[col].dtype, pd.CategoricalDtype):
+            new = added[col].cat.set_categories(added[col].cat.categories.astype(history[col].cat.categories.dtype))
+            columns[col] = union_categoricals([history[col], new], sort_categories=True)
+        else:
+            columns[col] = pd.concat([history[col], added[col]], ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def append(batch, path=data_store.DATASET_PATH):
+    """Append the raw listings in ``batch`` to the dataset CSV and refresh its artifacts.
+
+    ``batch`` has the CSV's columns (``brand``, ``model``, ``km_driven``, ...);
+    missing ones are left empty. Returns the new listings and per-stage
+    timings.
+    """
+    seconds = {}
+    start = time.perf_counter()
+    history = data_store.load_listings(path)
+    index = filter_index.load_filter_index(path)
+    cube = aggregates.load_cube(path)
+    seconds["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    header, newline, next_id, ends_with_newline = _layout(path)
+    rows = _format_rows(batch, header, newline, next_id)
+    added = data_store.clean(pd.read_csv(io.BytesIO(header + rows)), fill=False)
+    added = _fill_added(history, index, added)
+    seconds["clean"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if len(added):
+        df = _combine(history, added)
+        index = index.append(df, len(history))
+        cube = cube.append(df, len(history))
+    else:
+        df = history
+    seconds["merge"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    data = rows if ends_with_newline else newline + rows
+    sha256 = model_registry.file_hash(path, data)
+    data_store._write_snapshot(path, sha256, df)
+    filter_index._write_index(path, sha256, index)
+    aggregates._write_cube(path, sha256, cube)
+    with open(path, "ab") as f:
+        f.write(data)
+    model_registry.put(path, data_store._load_snapshot, df, sha256)
+    model_registry.put(path, filter_index._load_index, index, sha256)
+    model_registry.put(path, aggregates._load_cube, cube, sha256)
+    seconds["write"] = time.perf_counter() - start
+    return df, seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="+", help="CSV files of new listings")
+    parser.add_argument("--data", default=data_store.DATASET_PATH, help="listings CSV to append to")
+    args = parser.parse_args(argv)
+
+    batch = pd.concat([pd.read_csv(f) for f in args.files], ignore_index=True)
+    df, seconds = append(batch, args.data)
+    print(f"appended {len(batch):,} rows -> {len(df):,} listings  "
+          + "  ".join(f"{stage} {s:.2f}s" for stage, s in seconds.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
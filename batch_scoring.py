@@ -0,0 +1,193 @@
+"""Score a large listings CSV on a pool of worker processes.
+
+``pricing.price_csv`` prices one chunk after another on a single core. Here
+the parent reads the CSV ``--chunksize`` rows at a time and hands the chunks
+to ``--workers`` processes (default one per core); each worker prices its
+chunk exactly like ``pricing.price_chunk`` and sends back the CSV text, which
+the parent writes in input order. At most two chunks per worker are in flight,
+so memory stays bounded whatever the file size.
+
+Workers do not load the model or the encoders themselves -- importing sklearn
+and unpickling the ensemble costs a process about 1.4 s and 85 MB:
+
+* the parent loads the sklearn model before starting the pool, and workers
+  are forked from it, so they share its pages copy-on-write;
+* the ``flat_model`` arrays and each encoder's labels (sorted) and codes are
+  exported once as ``.npy`` files under ``.cache/``, keyed by both artifacts'
+  content hashes, and memory-mapped by every worker.
+
+When workers are forked, chunks of more than ``FLAT_MAX_ROWS`` rows go to
+sklearn's compiled ``predict``, which is about twice as fast per row on
+batches, like ``pricing.model_for``. Where ``fork`` is not available, workers
+never import sklearn and price every chunk with the mapped flat evaluator,
+whose predictions are bit-identical. Either way the output is byte-for-byte
+what ``pricing.price_csv(SRC, chunksize)`` produces.
+
+    python batch_scoring.py listings.csv priced.csv --workers 8
+"""
+import argparse
+import collections
+import glob
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import data_store
+import flat_model
+import model_registry
+import pricing
+
+_shared = {}  # set in each worker by _attach
+
+
+class SharedTable:
+    """Read-only ``label -> code`` lookup over sorted, memory-mapped arrays.
+
+    Stands in for a dict from ``pricing.encoder_tables``: ``encode_column``
+    only calls ``get``. Like the dicts, only ``str`` keys can match.
+    """
+
+    def __init__(self, labels, codes):
+        self.labels = labels
+        self.codes = codes
+
+    def get(self, key, default=None):
+        if isinstance(key, str):
+            i = int(np.searchsorted(self.labels, key))
+            if i < len(self.labels) and self.labels[i] == key:
+                return int(self.codes[i])
+        return default
+
+    def __len__(self):
+        return len(self.labels)
+
+
+def shared_dir(model_path=model_registry.MODEL_PATH, encoders_path=model_registry.ENCODERS_PATH, key=None):
+    if key is None:
+        key = f"{model_registry.content_hash(model_path)[:16]}.{model_registry.content_hash(encoders_path)[:16]}"
+    return os.path.join(flat_model.CACHE_DIR, f"batch_scoring.{key}")
+
+
+def export_shared(model_path=model_registry.MODEL_PATH, encoders_path=model_registry.ENCODERS_PATH):
+    """Directory of mappable model and encoder arrays for the current artifacts, written if missing."""
+    directory = shared_dir(model_path, encoders_path)
+    if os.path.isdir(directory):
+        return directory
+
+    flat = model_registry.load(model_path, flat_model.load_flat_model)
+    tables = model_registry.load(encoders_path, pricing.load_encoder_tables)
+    tmp = os.path.join(flat_model.CACHE_DIR, f".batch_scoring.tmp{os.getpid()}")  # outside the stale glob
+    flat.save_arrays(tmp)
+    for col, table in tables.items():
+        labels = sorted(table)
+        np.save(os.path.join(tmp, f"{col}.labels.npy"), np.array(labels, dtype=str))
+        np.save(os.path.join(tmp, f"{col}.codes.npy"), np.array([table[label] for label in labels], dtype=np.int64))
+    for stale in glob.glob(shared_dir(key="*")):
+        shutil.rmtree(stale, ignore_errors=True)
+    try:
+        os.rename(tmp, directory)
+    except OSError:  # another process exported the same artifacts first
+        shutil.rmtree(tmp, ignore_errors=True)
+    return directory
+
+
+def open_shared(directory):
+    """``(flat model, encoder tables)`` mapped from an ``export_shared`` directory."""
+    model = flat_model.FlatGradientBoost.open_arrays(directory)
+    tables = {
+        col: SharedTable(np.load(os.path.join(directory, f"{col}.labels.npy"), mmap_mode="r"),
+                         np.load(os.path.join(directory, f"{col}.codes.npy"), mmap_mode="r"))
+        for col in pricing.ENCODED_COLS
+    }
+    return model, tables
+
+
+def _attach(directory, compiled):
+    # Worker initializer: map the shared arrays once per process
+    _shared["flat"], _shared["tables"] = open_shared(directory)
+    _shared["launch_years"] = data_store.load_launch_years()
+    _shared["compiled"] = compiled  # whether the sklearn model is already in this process
+
+
+def _model_for(n_rows):
+    # pricing.model_for, with the mapped flat evaluator
+    if n_rows <= pricing.FLAT_MAX_ROWS or not _shared["compiled"]:
+        return _shared["flat"]
+    return model_registry.get_model()  # loaded by the parent, inherited when forked
+
+
+def _score(chunk, header):
+    model = _model_for(min(len(chunk), pricing.CHUNK_SIZE))
+    priced = pricing.price_chunk(chunk, model, _shared["tables"], _shared["launch_years"])
+    return pricing.chunk_to_csv(priced, header)
+
+
+def _context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("fork" if "fork" in methods else None)
+
+
+def _ordered(pool, tasks, window):
+    # Results in submission order, with at most ``window`` chunks in flight
+    pending = collections.deque()
+    for args in tasks:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(_score, *args))
+    while pending:
+        yield pending.popleft().result()
+
+
+def score_csv(src, out, workers=None, chunksize=pricing.CHUNK_SIZE):
+    """Price the listings CSV ``src`` into ``out``; returns the number of rows."""
+    workers = workers or os.cpu_count() or 1
+    directory = export_shared()
+    context = _context()
+    compiled = workers == 1 or context.get_start_method() == "fork"
+    if compiled and chunksize > pricing.FLAT_MAX_ROWS:
+        model_registry.get_model()  # before forking, so workers share it
+    n_rows = 0
+
+    def tasks():
+        nonlocal n_rows
+        for i, chunk in enumerate(pd.read_csv(src, chunksize=chunksize)):
+            n_rows += len(chunk)
+            yield chunk, i == 0
+
+    tmp = out + ".tmp"
+    with open(tmp, "w", newline="") as f:
+        if workers == 1:
+            _attach(directory, compiled)
+            f.writelines(_score(*args) for args in tasks())
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                     initializer=_attach, initargs=(directory, compiled)) as pool:
+                f.writelines(_ordered(pool, tasks(), 2 * workers))
+    os.replace(tmp, out)
+    return n_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("src", help="listings CSV")
+    parser.add_argument("out", help="priced CSV to write")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument("--chunksize", type=int, default=pricing.CHUNK_SIZE, help="rows per task")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    n_rows = score_csv(args.src, args.out, args.workers, args.chunksize)
+    seconds = time.perf_counter() - start
+    print(f"scored {n_rows:,} rows -> {args.out} in {seconds:.1f}s "
+          f"({n_rows / seconds:,.0f} rows/s, {args.workers or os.cpu_count() or 1} workers)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
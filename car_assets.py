@@ -0,0 +1,119 @@
+"""Resolver for the per-model car photos and per-brand logos.
+
+The pages look up ``car_images/{brand}_{model}.{jpg,png,webp}`` and
+``car_logos/{brand}.png``. Instead of probing each candidate with
+``os.path.exists`` on every rerun, each directory is listed once into an
+in-memory index. Lookups only re-check the directory's mtime, at most every
+``CHECK_INTERVAL`` seconds, and rescan it when a file was added, removed or
+renamed, so almost every lookup is a dict access. A missing directory is
+indexed as empty and picked up once it appears.
+
+Images embedded as ``<img>`` tags are base64-encoded once and kept in a
+bounded LRU (``ASSET_CACHE_SIZE`` entries) that is dropped whenever either
+directory changes.
+"""
+import os
+import threading
+import time
+
+import model_registry
+import static_assets
+from lru_cache import LRUCache
+
+IMAGES_DIR = os.path.join(model_registry.BASE_DIR, "car_images")
+LOGOS_DIR = os.path.join(model_registry.BASE_DIR, "car_logos")
+IMAGE_EXTS = (".jpg", ".png", ".webp")  # preference order when several exist
+CHECK_INTERVAL = 2.0  # seconds between directory mtime checks
+ASSET_CACHE_SIZE = int(os.environ.get("ASSET_CACHE_SIZE", 64))
+
+
+class DirectoryIndex:
+    def __init__(self, path, check_interval=CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self.scans = 0
+        self._mtime = None
+        self._checked = None
+        self._files = {}  # stem -> {ext: path}
+        self._lock = threading.Lock()
+
+    def _scan(self):
+        files = {}
+        try:
+            entries = list(os.scandir(self.path))
+        except OSError:
+            entries = []
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            if entry.is_file():
+                files.setdefault(stem, {})[ext.lower()] = entry.path
+        self._files = files
+        self.scans += 1
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._checked is not None and now - self._checked < self.check_interval:
+                return
+            self._checked = now
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime = None
+            if force or mtime != self._mtime:
+                self._mtime = mtime
+                self._scan()
+
+    @property
+    def version(self):
+        return self._mtime
+
+    def find(self, stem, exts=IMAGE_EXTS):
+        """Path of ``stem`` with the first extension in ``exts`` that exists, else None."""
+        self.refresh()
+        by_ext = self._files.get(stem)
+        if by_ext:
+            for ext in exts:
+                if ext in by_ext:
+                    return by_ext[ext]
+        return None
+
+
+images = DirectoryIndex(IMAGES_DIR)
+logos = DirectoryIndex(LOGOS_DIR)
+_encoded = LRUCache(maxsize=ASSET_CACHE_SIZE)  # path -> data URI, per directory version
+
+
+def image_stem(brand, model):
+    model = str(model).strip().lower().replace(" ", "_")
+    return f"{str(brand).strip().lower()}_{model}" if brand else model
+
+
+def image_path(brand, model):
+    """Photo of ``brand model`` in ``car_images/``, or None."""
+    return images.find(image_stem(brand, model))
+
+
+def logo_path(brand):
+    """Logo of ``brand`` in ``car_logos/``, or None."""
+    return logos.find(str(brand).lower(), (".png",))
+
+
+def image_uri(brand, model):
+    """``data:`` URI of the model's photo for inline ``<img>`` tags, or None."""
+    path = image_path(brand, model)
+    if path is None:
+        return None
+    version = (images.version, logos.version)
+    uri = _encoded.get(path, version)
+    if uri is None:
+        try:
+            uri = static_assets.read_data_uri(path)
+        except OSError:  # removed since the last scan
+            return None
+        _encoded.put(path, uri, version)
+    return uri
+
+
+def stats():
+    return {"image_scans": images.scans, "logo_scans": logos.scans, "encoded": _encoded.stats()}
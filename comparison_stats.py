@@ -0,0 +1,93 @@
+"""Per-model statistics for the Comparison page.
+
+For one combination of the page's filters (fuel types, transmissions, year
+range) a single ``groupby(["brand", "model"])`` yields every figure the page
+shows -- mean specs, min/mean/max price, price per km and depreciation -- for
+all models at once, plus each model's row positions for the box and scatter
+plots. The result is memoized per filter combination in a small LRU that is
+dropped when the dataset changes, so comparing any number of models is a
+``.loc`` lookup.
+"""
+import os
+
+import numpy as np
+
+import data_store
+import filter_index
+from lru_cache import LRUCache
+
+MEAN_COLS = ["engine", "mileage", "seats", "vehicle_age", "km_driven", "selling_price"]
+STATS_CACHE_SIZE = int(os.environ.get("COMPARISON_CACHE_SIZE", 32))
+
+_cache = LRUCache(maxsize=STATS_CACHE_SIZE)  # filter key -> ModelStats, per dataset version
+
+
+class ModelStats:
+    def __init__(self, table, rows):
+        self.table = table  # indexed by (brand, model)
+        self.rows = rows    # (brand, model) -> row positions in the listings
+
+    @property
+    def empty(self):
+        return self.table.empty
+
+    def brands(self):
+        return sorted(self.table.index.unique(level="brand"))
+
+    def models(self, brand):
+        """Sorted models of ``brand`` that have listings under the filters."""
+        if brand not in self.table.index.get_level_values("brand"):
+            return []
+        return sorted(self.table.xs(brand, level="brand").index)
+
+    def lookup(self, pairs):
+        """Rows of the table for ``pairs`` (unknown pairs are skipped), in the given order."""
+        pairs = [p for p in pairs if p in self.rows]
+        return self.table.loc[pairs]
+
+    def listings(self, df, brand, model):
+        return df.take(self.rows[(brand, model)])
+
+
+def compute(df, index, fuel, transmission, year_range):
+    """Statistics per (brand, model) over the listings matching the filters.
+
+    As on the page, an empty fuel or transmission selection matches nothing.
+    """
+    if fuel and transmission:
+        matches = index.query({"fuel_type": fuel, "transmission": transmission}, {"year": year_range})
+        positions = index.rows(matches)
+    else:
+        positions = np.empty(0, dtype=np.intp)
+    listings = df[["brand", "model"] + MEAN_COLS].take(positions)
+
+    groups = listings.groupby(["brand", "model"], observed=True, sort=True)
+    table = groups[MEAN_COLS].mean().add_suffix("_mean")
+    table["count"] = groups.size()
+    price = groups["selling_price"]
+    table["selling_price_min"] = price.min()
+    table["selling_price_max"] = price.max()
+
+    avg_price, max_price = table["selling_price_mean"], table["selling_price_max"]
+    km = table["km_driven_mean"]
+    table["price_per_km"] = avg_price / km.where(km != 0)
+    table["depreciation"] = (100 * (1 - avg_price / max_price)).where(max_price != 0, 0.0)
+
+    rows = {key: positions[idx] for key, idx in groups.indices.items()}
+    return ModelStats(table, rows)
+
+
+def model_stats(fuel, transmission, year_range, path=data_store.DATASET_PATH):
+    """Memoized ``compute`` over the shared listings for one filter combination."""
+    df = data_store.load_listings(path)
+    version = data_store.version(path)
+    key = (tuple(sorted(fuel)), tuple(sorted(transmission)), tuple(year_range))
+    stats = _cache.get(key, version)
+    if stats is None:
+        stats = compute(df, filter_index.load_filter_index(path), fuel, transmission, year_range)
+        _cache.put(key, stats, version)
+    return stats
+
+
+def cache_stats():
+    return _cache.stats()
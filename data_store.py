@@ -0,0 +1,197 @@
+"""Shared, pre-cleaned snapshot of ``car_dataset.csv`` for every page.
+
+The CSV is parsed and cleaned once: junk ``Unnamed`` columns are dropped,
+column names are normalised to lower case, numeric columns are typed and the
+low-cardinality text columns become categoricals; missing specs are filled
+from their model's (else brand's) most common value (``impute``). The result is persisted as
+an Arrow/Feather snapshot next to the CSV (keyed by the CSV's content hash), so
+later processes skip the CSV parse entirely. Within a process the frame is held
+by ``model_registry`` and shared by all sessions -- treat it as read-only.
+
+Files too large for memory can be cleaned chunk by chunk with ``iter_clean``.
+"""
+import os
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+import impute
+import model_registry
+
+try:
+    import pyarrow  # noqa: F401  (required by DataFrame.to_feather)
+except ImportError:  # snapshot persistence is optional
+    pyarrow = None
+
+DATASET_PATH = os.path.join(model_registry.BASE_DIR, "car_dataset.csv")
+LAUNCH_YEARS_PATH = os.path.join(model_registry.BASE_DIR, "inferred_launch_years.csv")
+SNAPSHOT_DIR = model_registry.CACHE_DIR
+SNAPSHOT_VERSION = 3  # bump when clean() changes so old snapshots are rebuilt
+CURRENT_YEAR = 2025
+CHUNK_SIZE = 100_000  # rows per chunk in streaming mode
+
+NUMERIC_COLS = ["vehicle_age", "km_driven", "mileage", "engine", "max_power", "seats", "selling_price"]
+CATEGORICAL_COLS = ["brand", "model", "fuel_type", "transmission"]
+
+
+def clean(df, fill=True):
+    """Canonical cleaning rules shared by all pages.
+
+    ``fill=False`` leaves missing specs for the caller to impute from more
+    listings than ``df`` holds.
+    """
+    df = df.loc[:, ~df.columns.duplicated(keep="first")]
+    df = df.loc[:, ~df.columns.str.strip().str.lower().str.startswith("unnamed")]
+    df.columns = df.columns.str.strip().str.lower()
+
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    if "year" not in df.columns and "vehicle_age" in df.columns:
+        df["year"] = CURRENT_YEAR - df["vehicle_age"]
+    df = df.dropna(subset=[c for c in ("brand", "model") if c in df.columns])
+    if fill and {"brand", "model"} <= set(df.columns):
+        df, _ = impute.fill_group_modes(df, impute.LISTING_COLUMNS, impute.LISTING_KEYS)
+    for col in CATEGORICAL_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df.reset_index(drop=True)
+
+
+def _common_dtype(dtypes):
+    # The dtype a whole-file read gives a column that chunks read as ``dtypes``
+    dtypes = set(dtypes)
+    if all(pd.api.types.is_numeric_dtype(d) for d in dtypes):
+        return np.result_type(*dtypes)
+    others = {d for d in dtypes if not pd.api.types.is_numeric_dtype(d)}
+    return others.pop() if len(others) == 1 else np.dtype(object)  # all-missing chunks read as float
+
+
+def _scan(path, chunksize):
+    # First streaming pass: column dtypes, categorical values and imputation counts
+    dtypes, categories, counts = {}, {}, {}
+    keys = impute.LISTING_KEYS
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        chunk = clean(chunk, fill=False)
+        for col, dtype in chunk.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                categories.setdefault(col, set()).update(dtype.categories)
+            else:
+                dtypes.setdefault(col, []).append(dtype)
+        if set(keys) <= set(chunk.columns):
+            plain = chunk.astype({k: str for k in keys})
+            for col, missing in impute.LISTING_COLUMNS.items():
+                if col in chunk.columns:
+                    chunk_counts = impute.group_counts(plain, col, keys, missing)
+                    if col in counts:
+                        chunk_counts = pd.concat([counts[col], chunk_counts]).groupby(level=keys + [col]).sum()
+                    counts[col] = chunk_counts
+    return (
+        {col: _common_dtype(d) for col, d in dtypes.items()},
+        {col: pd.CategoricalDtype(sorted(values)) for col, values in categories.items()},
+        counts,
+    )
+
+
+def iter_clean(path=DATASET_PATH, chunksize=CHUNK_SIZE):
+    """Yield ``clean(pd.read_csv(path))`` as consecutive slices, one chunk in memory at a time.
+
+    The file is read twice. The first pass collects what cleaning needs from
+    the whole file -- each column's dtype, the categories, the value counts
+    behind imputation -- so every slice (dtypes, categories, filled values and
+    row index) equals the same rows of the in-memory frame.
+    """
+    dtypes, categories, counts = _scan(path, chunksize)
+    start = 0
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        chunk = clean(chunk, fill=False).astype({**dtypes, **categories})
+        if counts:
+            chunk, _ = impute.fill_group_modes(chunk, impute.LISTING_COLUMNS, impute.LISTING_KEYS, counts)
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield chunk
+
+
+def _snapshot_path(csv_path, sha256):
+    return model_registry.cache_path(csv_path, f"v{SNAPSHOT_VERSION}.{sha256[:16]}.feather")
+
+
+def _load_snapshot(csv_path):
+    if pyarrow is None:
+        return clean(pd.read_csv(csv_path))
+
+    sha256 = model_registry.content_hash(csv_path)
+    snapshot = _snapshot_path(csv_path, sha256)
+    if os.path.exists(snapshot):
+        return pd.read_feather(snapshot)
+
+    df = clean(pd.read_csv(csv_path))
+    _write_snapshot(csv_path, sha256, df)
+    return df
+
+
+def _write_snapshot(csv_path, sha256, df):
+    if pyarrow is None:
+        return
+    model_registry.write_cache(_snapshot_path(csv_path, sha256),
+                               lambda f: df.to_feather(f, compression="uncompressed"),
+                               stale=model_registry.cache_path(csv_path, "*.feather"))
+
+
+def load_listings(path=DATASET_PATH):
+    """Cleaned listings frame, shared across sessions. Do not mutate it."""
+    return model_registry.load(path, _load_snapshot)
+
+
+def _build_catalog(path):
+    df = load_listings(path)
+    brands = sorted(df["brand"].dropna().unique())
+    models = sorted(df["model"].dropna().unique())
+
+    pairs = df[["brand", "model"]].drop_duplicates()
+    models_by_brand = {
+        brand: sorted(group["model"])
+        for brand, group in pairs.groupby("brand", observed=True)
+    }
+
+    # Spec defaults match case-insensitively, like the form always did
+    keys = [df["brand"].astype(str).str.lower(), df["model"].astype(str).str.lower()]
+    means = df[["engine", "mileage"]].groupby(keys).mean()
+    specs = {
+        key: {"engine": row.engine, "mileage": row.mileage}
+        for key, row in zip(means.index, means.itertuples())
+    }
+    return {"brands": brands, "models": models, "models_by_brand": models_by_brand, "specs": specs}
+
+
+def load_catalog(path=DATASET_PATH):
+    """Prebuilt lookups for the Prediction form, built once per dataset version.
+
+    ``brands``/``models`` are sorted lists, ``models_by_brand`` maps a brand to
+    its sorted models and ``specs`` maps lower-cased ``(brand, model)`` to the
+    mean ``engine`` and ``mileage`` (NaN when unknown).
+    """
+    return model_registry.load(path, _build_catalog)
+
+
+def launch_key(brand, model):
+    return (str(brand).strip().lower(), str(model).strip().lower())
+
+
+def _read_launch_years(path):
+    df = pd.read_csv(path).dropna(subset=["brand", "model", "inferred_launch_year"])
+    return MappingProxyType({
+        launch_key(b, m): int(y)
+        for b, m, y in zip(df["brand"], df["model"], df["inferred_launch_year"])
+    })
+
+
+def load_launch_years(path=LAUNCH_YEARS_PATH):
+    """Read-only ``launch_key(brand, model) -> first manufacture year`` mapping."""
+    return model_registry.load(path, _read_launch_years)
+
+
+def version(path=DATASET_PATH):
+    """Content hash of the dataset currently served by ``load_listings``."""
+    return model_registry.version(path, _load_snapshot)
@@ -0,0 +1,257 @@
+"""Inverted index over the listings for the Filtering page.
+
+Built once per dataset version:
+
+* categorical columns (brand, model, fuel_type, transmission) get one packed
+  bitmap per value, one bit per row;
+* range columns (year, price, ...) keep their values sorted next to the row
+  ids, so a range becomes two binary searches.
+
+A filter combination is resolved by OR-ing the selected values' bitmaps within
+a column, AND-ing the columns together and materialising the rows with a
+single ``take``. Bitmaps cost n/8 bytes per value, and combining them touches
+n/8 bytes per operation whatever the filter, so latency stays flat as the
+listings grow.
+
+Each indexed column also keeps its full sort order, so a sorted page of the
+matches is a filter over a precomputed permutation rather than a sort, and
+counts and means are answered from the bitmap without building a frame.
+
+New listings are folded in with ``append``: bitmaps are widened, and each
+column's order is extended by binary-searching the new rows into it, so only
+the new rows are sorted. The index is pickled under ``.cache/`` keyed by the
+dataset's content hash.
+"""
+import copy
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+import data_store
+import model_registry
+
+INDEX_VERSION = 1  # bump when the layout changes so old pickles are rebuilt
+CATEGORICAL_COLS = ["brand", "model", "fuel_type", "transmission"]
+RANGE_COLS = ["year", "vehicle_age", "km_driven", "mileage", "engine", "selling_price"]
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class FilterIndex:
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self.bitmaps = {}
+        self.categories = {}  # categorical column -> values in sort-key order
+        self.orders = {}  # column -> (row order, number of non-missing rows at its front)
+        self.sort_keys = {}  # column -> per-row value ranks or numbers, in dataset order
+        for col in CATEGORICAL_COLS:
+            if col in df.columns:
+                self.bitmaps[col] = self._value_bitmaps(col, df[col])
+        self.ranges = {}
+        self.numeric = {}
+        for col in RANGE_COLS:
+            if col in df.columns:
+                values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+                order = np.argsort(values, kind="stable")  # NaN sorts last
+                n_valid = int(np.count_nonzero(~np.isnan(values)))
+                self.numeric[col] = self.sort_keys[col] = values
+                self.orders[col] = (order, n_valid)
+                self.ranges[col] = (values[order[:n_valid]], order[:n_valid])
+
+    def _value_bitmaps(self, col, series):
+        if hasattr(series, "cat"):
+            codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+            if not series.cat.ordered:
+                # Rank by value so sorting follows the labels, not category order
+                rank = np.argsort(np.argsort(np.asarray(uniques, dtype=object), kind="stable"))
+                uniques = uniques[np.argsort(rank)]
+                codes = np.where(codes >= 0, rank[codes], -1)
+        else:
+            codes, uniques = series.factorize(sort=True)
+        self.categories[col] = np.asarray(uniques, dtype=object)
+        order = np.argsort(np.where(codes < 0, len(uniques), codes), kind="stable")  # missing last
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        self.orders[col] = (order, int(np.count_nonzero(codes >= 0)))
+        self.sort_keys[col] = codes
+        bitmaps = {}
+        for k, value in enumerate(uniques):
+            if bounds[k] == bounds[k + 1]:
+                continue  # unused category
+            bitmaps[value] = self._bitmap(order[bounds[k]:bounds[k + 1]])
+        return bitmaps
+
+    def _bitmap(self, rows):
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[rows] = True
+        return np.packbits(mask)
+
+    def append(self, df, start):
+        """Index of ``df``, whose first ``start`` rows are the ones indexed here.
+
+        Returns a new index and leaves this one untouched for readers still
+        holding it.
+        """
+        new = copy.copy(self)
+        new.n_rows = len(df)
+        new.bitmaps, new.categories = dict(self.bitmaps), dict(self.categories)
+        new.orders, new.sort_keys = dict(self.orders), dict(self.sort_keys)
+        new.ranges, new.numeric = dict(self.ranges), dict(self.numeric)
+        for col in self.bitmaps:
+            new._append_values(col, df[col].iloc[start:], self)
+        for col in self.ranges:
+            added = df[col].iloc[start:].to_numpy(dtype=np.float64, na_value=np.nan)
+            values = np.concatenate([self.numeric[col], added])
+            new.numeric[col] = new.sort_keys[col] = values
+            order, n_valid = new.orders[col] = _merge_order(*self.orders[col], values, ~np.isnan(values), start)
+            new.ranges[col] = (values[order[:n_valid]], order[:n_valid])
+        return new
+
+    def _append_values(self, col, added, old):
+        start = old.n_rows
+        labels = pd.Index(sorted(set(old.categories[col]).union(added.dropna().unique())))
+        self.categories[col] = np.asarray(labels, dtype=object)
+        rank = labels.get_indexer(old.categories[col])
+        old_codes = old.sort_keys[col]
+        added_codes = labels.get_indexer(np.asarray(added, dtype=object))
+        codes = np.concatenate([np.where(old_codes >= 0, rank[old_codes], -1), added_codes])
+        self.sort_keys[col] = codes
+        self.orders[col] = _merge_order(*old.orders[col], codes, codes >= 0, start)
+
+        order = np.argsort(added_codes, kind="stable")
+        bounds = np.searchsorted(added_codes[order], np.arange(len(labels) + 1))
+        bitmaps = {}
+        for k, value in enumerate(labels):
+            rows = start + order[bounds[k]:bounds[k + 1]]
+            if value in old.bitmaps[col] or len(rows):
+                bitmaps[value] = self._widen(old.bitmaps[col].get(value), rows)
+        self.bitmaps[col] = bitmaps
+
+    def _widen(self, bitmap, rows):
+        # ``bitmap`` padded to n_rows bits, with ``rows`` (all past its end) set
+        out = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        if bitmap is not None:
+            out[:len(bitmap)] = bitmap
+        np.bitwise_or.at(out, rows >> 3, (0x80 >> (rows & 7)).astype(np.uint8))
+        return out
+
+    def values(self, col):
+        """Sorted distinct values of a categorical column."""
+        return sorted(self.bitmaps.get(col, {}))
+
+    def bounds(self, col):
+        """``(min, max)`` of a range column, or ``None`` if it is empty/unknown."""
+        values = self.ranges.get(col, (np.empty(0),))[0]
+        return (values[0], values[-1]) if len(values) else None
+
+    def all_rows(self):
+        return self._bitmap(slice(None))
+
+    def query(self, selections=None, ranges=None):
+        """Packed bitmap of rows matching every filter.
+
+        ``selections`` maps a categorical column to the accepted values (empty
+        or missing means no filter); ``ranges`` maps a range column to an
+        inclusive ``(low, high)``.
+        """
+        result = self.all_rows()
+        for col, selected in (selections or {}).items():
+            if not selected:
+                continue
+            col_bitmaps = self.bitmaps.get(col, {})
+            matched = np.zeros_like(result)
+            for value in selected:
+                if value in col_bitmaps:
+                    np.bitwise_or(matched, col_bitmaps[value], out=matched)
+            np.bitwise_and(result, matched, out=result)
+        for col, (low, high) in (ranges or {}).items():
+            if col not in self.ranges:
+                continue
+            values, order = self.ranges[col]
+            start, stop = np.searchsorted(values, low, "left"), np.searchsorted(values, high, "right")
+            np.bitwise_and(result, self._bitmap(order[start:stop]), out=result)
+        return result
+
+    def count(self, bitmap):
+        return int(_POPCOUNT[bitmap].sum(dtype=np.int64))
+
+    def mask(self, bitmap):
+        return np.unpackbits(bitmap, count=self.n_rows).view(bool)
+
+    def mean(self, col, bitmap):
+        """Mean of a range column over the matching rows, skipping missing values."""
+        if col not in self.numeric:
+            return None
+        values = self.numeric[col][self.mask(bitmap)]
+        values = values[~np.isnan(values)]
+        return float(values.mean()) if len(values) else None
+
+    def rows(self, bitmap):
+        """Row positions set in ``bitmap``, in dataset order."""
+        return np.flatnonzero(self.mask(bitmap))
+
+    def sorted_rows(self, bitmap, by=None, ascending=True):
+        """Row positions set in ``bitmap`` ordered by column ``by`` (missing values last).
+
+        Ties keep dataset order in both directions, like a stable
+        ``sort_values``. Without ``by`` (or for an unindexed column) rows come
+        back in dataset order.
+        """
+        if by not in self.orders:
+            return self.rows(bitmap)
+        order, n_valid = self.orders[by]
+        mask = self.mask(bitmap)
+        valid = order[:n_valid][mask[order[:n_valid]]]
+        missing = order[n_valid:][mask[order[n_valid:]]]
+        if not ascending:
+            valid = self._reverse_runs(by, valid)
+        return np.concatenate([valid, missing])
+
+    def _reverse_runs(self, col, rows):
+        # Reverse the value order but keep each run of equal values in dataset order
+        keys = self.sort_keys[col][rows]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        run = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(rows)]))
+        return rows[np.lexsort((np.arange(len(rows)), -run))]
+
+    def take(self, df, bitmap, by=None, ascending=True, start=0, stop=None):
+        """Matching rows of ``df``, optionally sorted and sliced to ``[start:stop]``."""
+        return df.take(self.sorted_rows(bitmap, by, ascending)[start:stop])
+
+
+def _merge_order(order, n_valid, keys, valid, start):
+    # Stable order of all rows by ``keys`` from the stable order of the first
+    # ``start`` rows: new rows go after equal old keys, missing rows last
+    added = start + np.flatnonzero(valid[start:])
+    added = added[np.argsort(keys[added], kind="stable")]
+    old = order[:n_valid]
+    at = np.searchsorted(keys[old], keys[added], side="right")
+    missing = np.concatenate([order[n_valid:], start + np.flatnonzero(~valid[start:])])
+    return np.concatenate([np.insert(old, at, added), missing]), n_valid + len(added)
+
+
+def _index_path(csv_path, sha256):
+    return model_registry.cache_path(csv_path, f"filter_index.v{INDEX_VERSION}.{sha256[:16]}.pkl")
+
+
+def _write_index(csv_path, sha256, index):
+    model_registry.write_cache(_index_path(csv_path, sha256),
+                               lambda f: pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL),
+                               stale=model_registry.cache_path(csv_path, "filter_index.*.pkl"))
+
+
+def _load_index(csv_path):
+    sha256 = model_registry.content_hash(csv_path)
+    path = _index_path(csv_path, sha256)
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    index = FilterIndex(data_store.load_listings(csv_path))
+    _write_index(csv_path, sha256, index)
+    return index
+
+
+def load_filter_index(path=data_store.DATASET_PATH):
+    return model_registry.load(path, _load_index)
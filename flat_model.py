@@ -0,0 +1,181 @@
+"""Flat-array evaluator for the GradientBoost ensemble.
+
+sklearn's ``GradientBoostingRegressor.predict`` pays input validation and a
+walk over 500 Python tree objects on every call, which dominates single-car
+latency. Here every tree is padded to a complete binary tree of the ensemble's
+depth and stored heap-ordered in contiguous arrays: ``feature`` and
+``threshold`` per internal node, ``value`` per leaf. The children of node ``i``
+are ``2i+1`` and ``2i+2``, so no child-pointer arrays are needed and a batch
+walks every tree at once, one level per step. Leaves shallower than the full
+depth are padded with copies of themselves, so every path has the same length.
+
+Predictions are bit-for-bit identical to ``model.predict``: inputs are cast to
+float32 like sklearn does, and ``learning_rate * leaf`` values are accumulated
+in tree order in float64.
+
+The arrays are cached as ``.npz`` under ``.cache/`` keyed by the pickle's content
+hash, and ``pricing.load_encoder_tables`` caches the encoders as JSON likewise,
+so once both are exported single cars and batches of up to
+``pricing.FLAT_MAX_ROWS`` are priced without importing sklearn. Run
+``python flat_model.py`` to export and check parity against ``model.predict``
+on the listings dataset.
+"""
+import os
+import sys
+
+import numpy as np
+
+import model_registry
+
+CACHE_DIR = model_registry.CACHE_DIR
+ROW_BLOCK = 256  # rows walked together; keeps the (trees x rows) work arrays in cache
+MAPPED_ARRAYS = ("feature", "threshold", "value")
+
+
+class FlatGradientBoost:
+    def __init__(self, feature, threshold, value, init, depth):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)      # (n_trees, 2**depth - 1)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)       # (n_trees, 2**depth)
+        self.init = float(init)
+        self.depth = int(depth)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Flatten a fitted single-output ``GradientBoostingRegressor``."""
+        trees = [est[0].tree_ for est in model.estimators_]
+        depth = max(t.max_depth for t in trees)
+        n_internal = 2 ** depth - 1
+        feature = np.zeros((len(trees), n_internal), dtype=np.intp)
+        threshold = np.zeros((len(trees), n_internal), dtype=np.float64)
+        value = np.zeros((len(trees), 2 ** depth), dtype=np.float64)
+
+        for t, tree in enumerate(trees):
+            stack = [(0, 0, 0)]  # (sklearn node, heap position, level)
+            while stack:
+                node, pos, level = stack.pop()
+                if tree.children_left[node] == -1:
+                    # Leaf: every heap leaf below ``pos`` gets its value
+                    span = 2 ** (depth - level)
+                    first = (pos + 1) * span - 1 - n_internal
+                    value[t, first:first + span] = model.learning_rate * tree.value[node, 0, 0]
+                    continue
+                feature[t, pos] = tree.feature[node]
+                threshold[t, pos] = tree.threshold[node]
+                stack.append((tree.children_left[node], 2 * pos + 1, level + 1))
+                stack.append((tree.children_right[node], 2 * pos + 2, level + 1))
+
+        return cls(feature, threshold, value, np.ravel(model.init_.constant_)[0], depth)
+
+    def _predict_block(self, X):
+        n_trees, n_internal = self.feature.shape
+        n = len(X)
+        x_flat = np.ascontiguousarray(X.T).ravel()
+        feature_offset = self.feature.ravel() * n  # start of each node's feature column in x_flat
+        rows = np.arange(n, dtype=np.intp)
+        tree_base = (np.arange(n_trees, dtype=np.intp) * n_internal)[:, None]
+        threshold = self.threshold.ravel()
+
+        node = np.zeros((n_trees, n), dtype=np.intp)
+        for _ in range(self.depth):
+            idx = tree_base + node
+            go_left = x_flat.take(feature_offset.take(idx) + rows) <= threshold.take(idx)
+            node = 2 * node + 2 - go_left
+
+        leaf = node - n_internal + (np.arange(n_trees, dtype=np.intp) * (n_internal + 1))[:, None]
+        # Sequential accumulation (init first, then trees in order) matches sklearn exactly
+        stages = np.empty((n_trees + 1, n))
+        stages[0] = self.init
+        stages[1:] = self.value.ravel().take(leaf)
+        return np.add.accumulate(stages, axis=0)[-1]
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        if np.isnan(X).any():
+            raise ValueError("Input X contains NaN.")
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), ROW_BLOCK):
+            out[start:start + ROW_BLOCK] = self._predict_block(X[start:start + ROW_BLOCK])
+        return out
+
+    @property
+    def nbytes(self):
+        return self.feature.nbytes + self.threshold.nbytes + self.value.nbytes
+
+    def save(self, path):
+        np.savez(path, feature=self.feature, threshold=self.threshold, value=self.value,
+                 init=self.init, depth=self.depth)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["feature"], data["threshold"], data["value"], data["init"], data["depth"])
+
+    def save_arrays(self, directory):
+        """Write the arrays as separate ``.npy`` files that ``open_arrays`` can map."""
+        os.makedirs(directory, exist_ok=True)
+        for name in MAPPED_ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        np.save(os.path.join(directory, "scalars.npy"), np.array([self.init, self.depth], dtype=np.float64))
+
+    @classmethod
+    def open_arrays(cls, directory):
+        """Memory-map arrays written by ``save_arrays`` instead of reading them.
+
+        Every process that opens the same files shares one read-only copy in
+        the page cache.
+        """
+        arrays = [np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in MAPPED_ARRAYS]
+        init, depth = np.load(os.path.join(directory, "scalars.npy"))
+        return cls(*arrays, init, depth)
+
+
+def export_path(model_path, sha256):
+    return model_registry.cache_path(model_path, f"{sha256[:16]}.npz")
+
+
+def load_flat_model(path):
+    """Registry loader: read the exported arrays, flattening the pickle if needed."""
+    exported = export_path(path, model_registry.content_hash(path))
+    if os.path.exists(exported):
+        return FlatGradientBoost.load(exported)
+
+    import joblib
+    flat = FlatGradientBoost.from_sklearn(joblib.load(path))
+    model_registry.write_cache(exported, flat.save, stale=export_path(path, "*"))
+    return flat
+
+
+def get_flat_model():
+    return model_registry.load(model_registry.MODEL_PATH, load_flat_model)
+
+
+def check_parity(model, flat, X):
+    """Number of rows where the flat evaluator differs from ``model.predict``."""
+    import pandas as pd
+    expected = model.predict(pd.DataFrame(X, columns=model.feature_names_in_))
+    return int(np.sum(flat.predict(X) != expected))
+
+
+def main():
+    import data_store
+    import pricing
+
+    model = model_registry.get_model()
+    flat = get_flat_model()
+
+    X = pricing.feature_frame(data_store.load_listings(), pricing.get_encoder_tables()).to_numpy()
+    noisy = X * np.random.default_rng(0).uniform(0.5, 1.5, size=X.shape)
+    mismatches = check_parity(model, flat, X) + check_parity(model, flat, noisy)
+
+    exported = export_path(model_registry.MODEL_PATH, model_registry.version(model_registry.MODEL_PATH))
+    print(f"Exported {flat.feature.shape[0]} trees of depth {flat.depth} "
+          f"({flat.nbytes / 1e6:.2f} MB) to {exported}")
+    print(f"Parity vs model.predict on {2 * len(X):,} rows: {mismatches} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Cold-start import report for Main and each page.
+
+Every measurement runs in a fresh interpreter with ``python -X importtime``:
+first the imports Main does at startup, then one page module on top of them
+(what the router pays the first time that page is opened). For each it prints
+the import time, peak RSS of the process and the heaviest packages pulled in.
+
+    python import_report.py
+    python import_report.py Prediction Analysis --top 10
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_IMPORTS = ["streamlit", "importlib", "static_assets"]
+PAGES = ["Home", "Filtering", "Analysis", "Prediction", "Comparison"]
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+RSS_SNIPPET = (
+    "\ntry:\n    import resource\n"
+    "    print('RSS_KB', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+    "except ImportError:\n    pass\n"
+)
+
+
+def measure(preload, module=None):
+    """Import ``preload`` then ``module`` in a child process; return (rows, peak RSS in MB)."""
+    code = "".join(f"import {m}\n" for m in preload)
+    if module:
+        code += "import sys; sys.stderr.write('MARK\\n')\n" + f"import {module}\n"
+    code += RSS_SNIPPET
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    stderr = proc.stderr
+    if module:
+        stderr = stderr.split("MARK\n", 1)[1]
+    rows = [
+        (int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2, m.group(4))
+        for m in map(LINE.match, stderr.splitlines()) if m
+    ]
+    rss = re.search(r"RSS_KB (\d+)", proc.stdout)
+    return rows, int(rss.group(1)) / 1024 if rss else None
+
+
+def summarize(label, rows, rss, top):
+    total_ms = sum(cum for _, cum, level, _ in rows if level == 0) / 1000
+    by_package = defaultdict(int)
+    for self_us, _, _, name in rows:
+        by_package[name.split(".")[0]] += self_us
+    heaviest = sorted(by_package.items(), key=lambda kv: -kv[1])[:top]
+
+    rss_text = f"{rss:,.0f} MB" if rss is not None else "n/a"
+    print(f"{label:<28} {total_ms:>9,.1f} ms  {len(rows):>5} modules  peak RSS {rss_text}")
+    for name, self_us in heaviest:
+        print(f"    {name:<24} {self_us / 1000:>9,.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", default=PAGES)
+    parser.add_argument("--top", type=int, default=5, help="heaviest packages to list")
+    args = parser.parse_args()
+
+    rows, rss = measure(MAIN_IMPORTS)
+    summarize("Main (startup)", rows, rss, args.top)
+    for page in args.pages:
+        rows, rss = measure(MAIN_IMPORTS, page)
+        summarize(f"+ {page} (first visit)", rows, rss, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""Parallel ingestion of the per-city CarDekho Excel exports.
+
+Each ``<city>_cars.xlsx`` holds one listing per row, with the details in three
+columns of Python-literal dicts (``new_car_detail``, ``new_car_overview``,
+``new_car_specs``). The notebook read the cities one after another and called
+``ast.literal_eval`` three times per row while appending to a dozen lists.
+Here:
+
+* every city file is read and parsed in its own worker process, so adding
+  cities adds parallel work rather than wall time (``--workers``, default one
+  per core);
+* a literal is parsed by rewriting it to JSON with one regex pass and handing
+  it to ``orjson``/``json``, about twice as fast as ``literal_eval``; anything
+  JSON cannot express (tuples, non-string keys, ``\\x`` escapes) falls back
+  to ``literal_eval``;
+* fields are pulled out a column at a time and typed with vectorised pandas
+  string ops;
+* the result is written as one typed Feather file.
+
+Fields and their positions follow the notebook's extraction. Values that do
+not parse become missing instead of raising; missing engine, mileage and max
+power figures are then filled from the model's (else the brand's) most common
+value with ``impute.fill_group_modes`` unless ``--no-impute`` is given.
+
+    python ingest.py --src raw/ --out car_listings_raw.feather
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import impute
+import model_registry
+
+try:
+    import orjson
+except ImportError:  # the stdlib parser is only a little slower
+    orjson = None
+
+try:
+    import python_calamine  # noqa: F401  (pandas' "calamine" Excel engine)
+except ImportError:
+    python_calamine = None
+
+RAW_COLS = ["new_car_detail", "new_car_overview", "new_car_specs", "car_links"]
+CITY_PATTERN = "*_cars.xlsx"
+DEFAULT_OUT = os.path.join(model_registry.BASE_DIR, "car_listings_raw.feather")
+PRICE_UNITS = {"Lakh": 1e5, "Crore": 1e7}
+
+_TOKEN = re.compile(r"""'((?:[^'\\]|\\.)*)'|"((?:[^"\\]|\\.)*)"|\b(True|False|None)\b""")
+_KEYWORDS = {"True": "true", "False": "false", "None": "null"}
+_json_loads = orjson.loads if orjson else json.loads
+
+
+def _to_json_token(match):
+    single, double, keyword = match.groups()
+    if keyword:
+        return _KEYWORDS[keyword]
+    if single is not None:
+        # repr() escapes ' inside single quotes but leaves " bare
+        return '"' + single.replace("\\'", "'").replace('"', '\\"') + '"'
+    return '"' + double + '"'
+
+
+def parse_literal(text):
+    """``ast.literal_eval`` for the dict/list/str/number literals of the exports."""
+    if not isinstance(text, str):
+        return None
+    if "\\x" not in text and "\\U" not in text:
+        try:
+            return _json_loads(_TOKEN.sub(_to_json_token, text))
+        except ValueError:
+            pass
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return None
+
+
+def _get(obj, *path):
+    for key in path:
+        try:
+            obj = obj[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return obj
+
+
+def _engine(specs):
+    value = _get(specs, "data", 0, "list", 2, "value")
+    if isinstance(value, str) and value.isnumeric():
+        return value
+    return _get(specs, "data", 0, "list", 1, "value")
+
+
+def _max_power(specs):
+    for item in _get(specs, "top") or []:
+        if _get(item, "key") == "Max Power":
+            return _get(item, "value")
+    return None
+
+
+def _number(values, pattern=r"([\d.]+)"):
+    text = pd.Series(values, dtype="object").astype("string")
+    number = pd.to_numeric(text.str.replace(",", "", regex=False).str.extract(pattern)[0], errors="coerce")
+    return number.astype("float64")
+
+
+def extract(raw, location):
+    """Typed listing columns from a city's raw export frame."""
+    detail = [parse_literal(v) for v in raw["new_car_detail"]]
+    overview = [parse_literal(v) for v in raw["new_car_overview"]]
+    specs = [parse_literal(v) for v in raw["new_car_specs"]]
+
+    price = pd.Series([_get(d, "price") for d in detail], dtype="object").astype("string")
+    price_parts = price.str.extract(r"([\d.,]+)\s*(Lakh|Crore)?")
+    car_price = (pd.to_numeric(price_parts[0].str.replace(",", "", regex=False), errors="coerce").astype("float64")
+                 * price_parts[1].map(PRICE_UNITS).fillna(1).astype("float64"))
+
+    produced = pd.to_numeric(pd.Series([_get(d, "modelYear") for d in detail]), errors="coerce")
+    registered = _number([_get(o, "top", 0, "value") for o in overview], r"(\d{4})\s*$")
+
+    df = pd.DataFrame({
+        "Fuel_Type": [_get(d, "ft") for d in detail],
+        "Kilometers_Driven": _number([_get(d, "km") for d in detail], r"(\d+)"),
+        "Transmission_Type": [_get(d, "transmission") for d in detail],
+        "No_of_Owners": pd.to_numeric(pd.Series([_get(d, "ownerNo") for d in detail]), errors="coerce"),
+        "Manufactured_By": [_get(d, "oem") for d in detail],
+        "Car_Model": [_get(d, "model") for d in detail],
+        "Car_Produced_Year": produced,
+        "Car_Price": car_price,
+        # Text like "...sive" in place of a year means not registered separately
+        "Registration_Year": registered.fillna(produced),
+        "No_of_Seats": _number([_get(o, "top", 3, "value") for o in overview], r"^(\d)"),
+        "Engine_CC": _number([_engine(s) for s in specs], r"^(\d+)$"),
+        "Mileage(kmpl)": _number([_get(s, "top", 0, "value") for s in specs]),
+        "Max_Power": _number([_max_power(s) for s in specs]),
+        "car_links": raw["car_links"].to_numpy() if "car_links" in raw else None,
+    })
+    for col in ["Kilometers_Driven", "No_of_Owners", "Car_Produced_Year", "Registration_Year", "No_of_Seats", "Engine_CC"]:
+        df[col] = df[col].astype("Int64")
+    df["Location"] = location
+    return df
+
+
+def city_name(path):
+    return os.path.basename(path).split("_")[0].title()
+
+
+def ingest_file(path):
+    """Read one city export and return its typed listings (runs in a worker)."""
+    raw = pd.read_excel(path, usecols=lambda c: c in RAW_COLS,
+                        engine="calamine" if python_calamine else None)
+    return extract(raw, city_name(path))
+
+
+def ingest(paths, workers=None):
+    """Listings of every file in ``paths``, concatenated in the given order."""
+    if not paths:
+        raise FileNotFoundError("no city exports to ingest")
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers == 1:
+        frames = [ingest_file(p) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(ingest_file, paths))
+    df = pd.concat(frames, ignore_index=True)
+    for col in ["Fuel_Type", "Transmission_Type", "Manufactured_By", "Car_Model", "Location"]:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help=f"city exports (default: {CITY_PATTERN} in --src)")
+    parser.add_argument("--src", default=model_registry.BASE_DIR)
+    parser.add_argument("--out", default=DEFAULT_OUT, help="Feather file to write")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument("--no-impute", action="store_true", help="leave missing specs missing")
+    args = parser.parse_args(argv)
+
+    paths = args.files or sorted(glob.glob(os.path.join(args.src, CITY_PATTERN)))
+    start = time.perf_counter()
+    df = ingest(paths, args.workers)
+    if not args.no_impute:
+        df, filled = impute.fill_group_modes(df, impute.RAW_COLUMNS, impute.RAW_KEYS)
+        print("imputed " + ", ".join(f"{n:,} {col}" for col, n in filled.items()))
+    tmp = args.out + ".tmp"
+    df.to_feather(tmp)
+    os.replace(tmp, args.out)
+    print(f"{len(paths)} cities, {len(df):,} listings -> {args.out} in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Load test for ``pricing_service``: reports p50/p99 latency and throughput.
+
+Start the service first (``uvicorn pricing_service:app --workers 4``), then::
+
+    python load_test.py --requests 2000 --concurrency 32
+    python load_test.py --endpoint batch --batch-size 500 --requests 200
+
+Request bodies are sampled from the listings dataset. Only the standard
+library is used on the client side.
+"""
+import argparse
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import data_store
+
+CAR_FIELDS = ["brand", "model", "fuel_type", "transmission", "km_driven", "vehicle_age", "engine", "mileage", "seats"]
+
+
+def sample_cars(n, seed=0):
+    df = data_store.load_listings()[CAR_FIELDS]
+    return json.loads(df.sample(n=n, replace=True, random_state=seed).to_json(orient="records"))
+
+
+def post(url, payload):
+    data = json.dumps(payload).encode()
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            resp.read()
+            ok = resp.status == 200
+    except urllib.error.URLError:
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--endpoint", choices=["single", "batch"], default="single")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    per_request = 1 if args.endpoint == "single" else args.batch_size
+    cars = sample_cars(min(args.requests * per_request, 50_000))
+    if args.endpoint == "single":
+        url = args.url.rstrip("/") + "/predict"
+        payloads = [random.choice(cars) for _ in range(args.requests)]
+    else:
+        url = args.url.rstrip("/") + "/predict/batch"
+        payloads = [{"cars": random.sample(cars, min(args.batch_size, len(cars)))} for _ in range(args.requests)]
+
+    post(url, payloads[0])  # warm-up
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda p: post(url, p), payloads))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([lat for lat, ok in results if ok]) * 1000
+    failures = sum(1 for _, ok in results if not ok)
+    print(f"Endpoint      : {url}")
+    print(f"Requests      : {len(results)} ({failures} failed), concurrency {args.concurrency}")
+    if len(latencies):
+        print(f"Latency p50   : {np.percentile(latencies, 50):.2f} ms")
+        print(f"Latency p99   : {np.percentile(latencies, 99):.2f} ms")
+    print(f"Throughput    : {len(results) / elapsed:,.1f} req/s, {len(results) * per_request / elapsed:,.1f} cars/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Thread-safe bounded LRU cache with optional expiry and version invalidation.
+
+Entries past ``maxsize`` are evicted least recently used first; with ``ttl``
+they also expire that many seconds after being stored. Callers that derive
+their values from an artifact pass its version (a content hash, a directory
+mtime) to ``get``/``put``: when a different version shows up, every entry is
+dropped at once instead of being served stale.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize  # 0 disables caching
+        self.ttl = ttl  # seconds; None or 0 disables expiry
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key, version=None):
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, version=None):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "invalidations": self.invalidations,
+            "version": self._version,
+        }
@@ -0,0 +1,195 @@
+"""Process-wide registry for the pickled model artifacts.
+
+Streamlit reruns a page script on every widget change. Loading through this
+module unpickles each file once per process and shares the object across all
+sessions and threads. A file is reloaded only when it changes on disk: a cheap
+``os.stat`` runs on every call, and the file is re-hashed only when its mtime or
+size moved, so touching a file without changing its bytes does not reload it.
+"""
+import glob
+import hashlib
+import os
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:  # memory metrics are optional
+    psutil = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, "GradientBoost_model.pkl")
+ENCODERS_PATH = os.path.join(BASE_DIR, "label_encoders.pkl")
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")  # derived artifacts, keyed by their source's content hash
+
+_lock = threading.RLock()  # loaders may load other artifacts
+_artifacts = {}
+_hashes = {}  # path -> (mtime_ns, size, sha256)
+
+
+def file_hash(path, tail=b""):
+    """sha256 of the file's bytes, followed by ``tail`` (the hash after appending it)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(tail)
+    return digest.hexdigest()
+
+
+def content_hash(path):
+    """``file_hash(path)``, computed at most once per (mtime, size) of the file.
+
+    Every loader of the same file shares the hash ``load`` computed, instead
+    of re-reading the file for its own cache key.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    cached = _hashes.get(path)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    sha256 = file_hash(path)
+    _hashes[path] = (stat.st_mtime_ns, stat.st_size, sha256)
+    return sha256
+
+
+def cache_path(source, suffix):
+    """``.cache/<source file name without extension>.<suffix>``."""
+    name = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(CACHE_DIR, f"{name}.{suffix}")
+
+
+def write_cache(path, write, stale=None):
+    """Write a derived artifact to ``path`` through a temporary file.
+
+    ``write(f)`` writes the contents to a binary file object. Files matching
+    the glob ``stale`` (older versions of the artifact) are removed first.
+    Returns False when nothing could be written, e.g. on a read-only
+    deployment, where callers keep their in-memory copy only.
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        for old in glob.glob(stale) if stale else ():
+            if old != path:
+                os.remove(old)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except OSError:
+        return False
+    return True
+
+
+def _rss():
+    return psutil.Process().memory_info().rss if psutil else None
+
+
+def _joblib_load(path):
+    import joblib  # deferred: pages that never unpickle anything skip the import
+    return joblib.load(path)
+
+
+def load(path, loader=_joblib_load):
+    """Return ``loader(path)``, loading it only the first time or after the file changed."""
+    path = os.path.abspath(path)
+    key = (path, loader)
+    stat = os.stat(path)
+
+    entry = _artifacts.get(key)
+    if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+        entry["hits"] += 1
+        return entry["obj"]
+
+    with _lock:
+        # Another thread may have reloaded while we waited for the lock
+        entry = _artifacts.get(key)
+        stat = os.stat(path)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            entry["hits"] += 1
+            return entry["obj"]
+
+        sha256 = content_hash(path)
+        if entry and entry["sha256"] == sha256:
+            entry["mtime_ns"] = stat.st_mtime_ns
+            entry["size"] = stat.st_size
+            entry["hits"] += 1
+            return entry["obj"]
+
+        rss_before = _rss()
+        start = time.perf_counter()
+        obj = loader(path)
+        load_seconds = time.perf_counter() - start
+        rss_after = _rss()
+
+        _artifacts[key] = {
+            "obj": obj,
+            "path": path,
+            "loader": getattr(loader, "__name__", repr(loader)),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": sha256,
+            "loaded_at": time.time(),
+            "load_seconds": load_seconds,
+            "rss_delta_bytes": rss_after - rss_before if psutil else None,
+            "loads": entry["loads"] + 1 if entry else 1,
+            "hits": 0,
+        }
+        return obj
+
+
+def put(path, loader, obj, sha256=None):
+    """Register ``obj`` as ``loader(path)`` for the file as it is on disk now.
+
+    For callers that derived the new object from the old one (e.g. after
+    appending to the file), so the next ``load`` does not run ``loader``.
+    """
+    path = os.path.abspath(path)
+    with _lock:
+        stat = os.stat(path)
+        if sha256 is None:
+            sha256 = content_hash(path)
+        else:
+            _hashes[path] = (stat.st_mtime_ns, stat.st_size, sha256)
+        entry = _artifacts.get((path, loader))
+        _artifacts[(path, loader)] = {
+            "obj": obj,
+            "path": path,
+            "loader": getattr(loader, "__name__", repr(loader)),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": sha256,
+            "loaded_at": time.time(),
+            "load_seconds": 0.0,
+            "rss_delta_bytes": None,
+            "loads": entry["loads"] if entry else 0,
+            "hits": 0,
+        }
+
+
+def version(path, loader=_joblib_load):
+    """Content hash of the currently loaded artifact (loads it if needed)."""
+    load(path, loader)
+    return _artifacts[(os.path.abspath(path), loader)]["sha256"]
+
+
+def get_model():
+    return load(MODEL_PATH)
+
+
+def get_encoders():
+    return load(ENCODERS_PATH)
+
+
+def stats():
+    """Load-time and memory metrics for every artifact loaded in this process."""
+    return [
+        {k: v for k, v in entry.items() if k != "obj"}
+        for entry in list(_artifacts.values())
+    ]
+
+
+def clear():
+    with _lock:
+        _artifacts.clear()
+        _hashes.clear()
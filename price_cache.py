@@ -0,0 +1,18 @@
+"""LRU/TTL cache of predicted prices keyed on the encoded feature vector.
+
+Repeat quotes (same brand/model/year after a UI tweak, or common configurations
+from API clients) are answered without touching the model. Entries are tagged
+with the model version they were computed under; when the model artifact
+changes on disk the whole cache is dropped on the next lookup.
+"""
+from lru_cache import LRUCache
+
+
+class PriceCache(LRUCache):
+    def __init__(self, maxsize=10_000, ttl=3600):
+        super().__init__(maxsize, ttl)
+
+    def stats(self):
+        stats = super().stats()
+        stats["model_version"] = stats.pop("version")
+        return stats
@@ -0,0 +1,255 @@
+"""Feature pipeline and vectorised pricing for the GradientBoost model.
+
+``Prediction.app()`` and bulk pricing share this module so a car is encoded,
+predicted and post-processed the same way whichever path priced it. The model
+predicts ``log(selling_price)``; prices are returned after the small new-car
+age adjustment and the ``exp`` back-transform, with a +/-5% market range.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import data_store
+import flat_model
+import model_registry
+from price_cache import PriceCache
+
+# Column order the model was trained on
+FEATURES = ["km_driven", "transmission", "model", "vehicle_age", "engine", "mileage", "fuel_type", "seats", "brand"]
+ENCODED_COLS = ["transmission", "model", "fuel_type", "brand"]
+REQUIRED_COLS = ["brand", "model", "fuel_type", "transmission", "km_driven", "engine", "mileage", "seats"]
+
+CURRENT_YEAR = data_store.CURRENT_YEAR
+MAX_AGE = 15
+CHUNK_SIZE = 50_000
+FLAT_MAX_ROWS = 256  # up to here the flat evaluator beats sklearn's per-call overhead
+PRICE_COLS = ["predicted_price", "lower_range", "upper_range"]
+
+# Shared by every session/request in the process; size 0 disables caching
+price_cache = PriceCache(
+    maxsize=int(os.environ.get("PRICE_CACHE_SIZE", 10_000)),
+    ttl=float(os.environ.get("PRICE_CACHE_TTL", 3600)),
+)
+
+
+def vehicle_age_from_year(year):
+    """Age used by the form: years since manufacture, capped at ``MAX_AGE``."""
+    return np.clip(CURRENT_YEAR - np.asarray(year), 0, MAX_AGE)
+
+
+def encoder_tables(encoders):
+    """Compile fitted ``LabelEncoder``s into dict lookups.
+
+    ``LabelEncoder.transform`` searches ``classes_`` on every call; a plain dict
+    gives the same label in O(1).
+    """
+    return {
+        col: {label: code for code, label in enumerate(encoder.classes_.tolist())}
+        for col, encoder in encoders.items()
+    }
+
+
+def _tables_path(encoders_path, sha256):
+    return model_registry.cache_path(encoders_path, f"{sha256[:16]}.json")
+
+
+def load_encoder_tables(path):
+    """Registry loader: the exported tables, compiled with ``encoder_tables`` if needed.
+
+    The tables are cached as JSON under ``.cache/`` keyed by the pickle's
+    content hash, so once exported they load without unpickling the
+    ``LabelEncoder``s, and so without importing sklearn.
+    """
+    exported = _tables_path(path, model_registry.content_hash(path))
+    if os.path.exists(exported):
+        with open(exported, encoding="utf-8") as f:
+            return json.load(f)
+
+    import joblib
+    tables = encoder_tables(joblib.load(path))
+    model_registry.write_cache(exported, lambda f: f.write(json.dumps(tables).encode()),
+                               stale=_tables_path(path, "*"))
+    return tables
+
+
+def get_encoder_tables():
+    return model_registry.load(model_registry.ENCODERS_PATH, load_encoder_tables)
+
+
+def encode_column(values, table):
+    """Vectorised lookup of a whole column, ``-1`` for unseen categories."""
+    # Look up each distinct value once, then broadcast through the factorized codes;
+    # the trailing -1 also catches missing values (code -1)
+    codes, uniques = pd.factorize(values)
+    mapping = np.fromiter((table.get(u, -1) for u in uniques), dtype=np.int64, count=len(uniques))
+    return np.append(mapping, -1)[codes]
+
+
+def _missing_fields(fields):
+    missing = [c for c in REQUIRED_COLS if c not in fields]
+    if "vehicle_age" not in fields and "year" not in fields:
+        missing.append("vehicle_age (or year)")
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+
+def feature_vector(car, tables):
+    """Encode one car (a mapping of form fields) into the model's feature list."""
+    _missing_fields(car)
+    vector = []
+    for col in FEATURES:
+        if col in ENCODED_COLS:
+            vector.append(tables[col].get(car[col], -1))
+        elif col == "vehicle_age" and col not in car:
+            vector.append(int(vehicle_age_from_year(int(car["year"]))))
+        else:
+            vector.append(float(car[col]))
+    return vector
+
+
+def feature_frame(df, tables):
+    """Build the model's input frame (``FEATURES`` order) from raw listing columns."""
+    _missing_fields(df.columns)
+
+    columns = {}
+    for col in FEATURES:
+        if col in ENCODED_COLS:
+            columns[col] = encode_column(df[col], tables[col])
+        elif col == "vehicle_age" and col not in df.columns:
+            columns[col] = vehicle_age_from_year(pd.to_numeric(df["year"], errors="coerce"))
+        else:
+            columns[col] = pd.to_numeric(df[col], errors="coerce").to_numpy()
+    return pd.DataFrame(columns, index=df.index, columns=FEATURES)
+
+
+def to_price(log_price, vehicle_age):
+    """Apply the new-car adjustment and back-transform log prices."""
+    log_price = np.asarray(log_price, dtype=np.float64)
+    vehicle_age = np.asarray(vehicle_age)
+    log_price = log_price + np.where(vehicle_age == 0, 0.02, np.where(vehicle_age == 1, 0.01, 0.0))
+    return np.exp(log_price)
+
+
+def model_for(n_rows):
+    """Flat evaluator for small batches, sklearn's compiled predict for large ones.
+
+    Both give bit-identical predictions, so this only picks the faster path.
+    """
+    if n_rows <= FLAT_MAX_ROWS:
+        return flat_model.get_flat_model()
+    return model_registry.get_model()
+
+
+def predict_price(car, model=None, tables=None):
+    """Price a single car given as a mapping of form fields.
+
+    With the default model, results are served from ``price_cache`` when the
+    same encoded car was priced before under the same model version.
+    """
+    tables = tables if tables is not None else get_encoder_tables()
+    X = feature_vector(car, tables)
+
+    if model is None:
+        key = tuple(X)
+        version = model_registry.version(model_registry.MODEL_PATH, flat_model.load_flat_model)
+        cached = price_cache.get(key, version)
+        if cached is not None:
+            return dict(cached)
+        model = flat_model.get_flat_model()
+    else:
+        key = None
+
+    price = float(to_price(model.predict([X])[0], X[FEATURES.index("vehicle_age")]))
+    result = {"predicted_price": price, "lower_range": price * 0.95, "upper_range": price * 1.05}
+    if key is not None:
+        price_cache.put(key, result, version)
+    return dict(result)
+
+
+def predict_prices(df, model=None, tables=None, chunk_size=CHUNK_SIZE):
+    """Return ``df`` with ``predicted_price``/``lower_range``/``upper_range`` appended.
+
+    Rows with a missing or non-numeric numeric field cannot be fed to the
+    model: they get NaN prices and ``missing_fields`` set to True instead of
+    failing the whole batch.
+    """
+    model = model if model is not None else model_for(min(len(df), chunk_size))
+    tables = tables if tables is not None else get_encoder_tables()
+
+    X = feature_frame(df, tables)
+    missing = X.isna().any(axis=1).to_numpy()
+    complete = np.flatnonzero(~missing)
+    prices = np.full(len(X), np.nan)
+    for start in range(0, len(complete), chunk_size):
+        rows = complete[start:start + chunk_size]
+        chunk = X.iloc[rows]
+        prices[rows] = to_price(model.predict(chunk), chunk["vehicle_age"].to_numpy())
+
+    return df.assign(predicted_price=prices, lower_range=prices * 0.95, upper_range=prices * 1.05,
+                     missing_fields=missing)
+
+
+def check_launch_years(df, launch_years=None):
+    """Vectorised launch-year check for a batch of cars.
+
+    Returns ``(launch_year, before_launch)``: the inferred launch year per row
+    (NaN when unknown) and whether the manufacture year predates it.
+    """
+    launch_years = launch_years if launch_years is not None else data_store.load_launch_years()
+    brand = df["brand"].astype(str).str.strip().str.lower()
+    model = df["model"].astype(str).str.strip().str.lower()
+    codes, uniques = pd.MultiIndex.from_arrays([brand, model]).factorize()
+    mapping = np.fromiter((launch_years.get(key, np.nan) for key in uniques), dtype=np.float64, count=len(uniques))
+    launch_year = np.append(mapping, np.nan)[codes]
+
+    if "year" in df.columns:
+        year = pd.to_numeric(df["year"], errors="coerce").to_numpy(dtype=np.float64)
+    else:
+        year = CURRENT_YEAR - pd.to_numeric(df["vehicle_age"], errors="coerce").to_numpy(dtype=np.float64)
+    return launch_year, year < launch_year
+
+
+def iter_priced_chunks(source, chunk_size=CHUNK_SIZE):
+    """Price a DataFrame, CSV path, uploaded CSV file or iterable of frames chunk by chunk.
+
+    Each chunk also gets ``launch_year`` and ``year_before_launch`` columns
+    flagging manufacture years earlier than the model's launch, and
+    ``missing_fields`` flagging rows left unpriced (see ``predict_prices``).
+    """
+    tables = get_encoder_tables()
+    launch_years = data_store.load_launch_years()
+    if isinstance(source, pd.DataFrame):
+        chunks = (source.iloc[i:i + chunk_size] for i in range(0, len(source), chunk_size))
+    elif isinstance(source, (str, os.PathLike)) or hasattr(source, "read"):
+        chunks = pd.read_csv(source, chunksize=chunk_size)
+    else:
+        chunks = source  # e.g. data_store.iter_clean()
+    for chunk in chunks:
+        yield price_chunk(chunk, tables=tables, launch_years=launch_years, chunk_size=chunk_size)
+
+
+def price_chunk(chunk, model=None, tables=None, launch_years=None, chunk_size=CHUNK_SIZE):
+    """Price one chunk of an upload: normalise headers, predict, flag pre-launch years."""
+    chunk.columns = chunk.columns.str.strip().str.lower()
+    priced = predict_prices(chunk, model, tables, chunk_size)
+    launch_year, before_launch = check_launch_years(priced, launch_years)
+    return priced.assign(launch_year=pd.array(launch_year, dtype="Int64"), year_before_launch=before_launch)
+
+
+def chunk_to_csv(priced, header=True):
+    # Whole rupees as int64: cheaper for to_csv to format than floats, and no trailing ".0";
+    # the prices of rows with missing fields are left empty
+    prices = {col: np.rint(np.nan_to_num(priced[col].to_numpy(dtype=np.float64))).astype(np.int64)
+              for col in PRICE_COLS}
+    if priced["missing_fields"].any():
+        complete = ~priced["missing_fields"].to_numpy()
+        prices = {col: pd.Series(v, index=priced.index, dtype=object).where(complete) for col, v in prices.items()}
+    return priced.assign(**prices).to_csv(index=False, header=header)
+
+
+def price_csv(source, chunk_size=CHUNK_SIZE):
+    """Yield priced results as CSV text, header first, one piece per chunk."""
+    for i, priced in enumerate(iter_priced_chunks(source, chunk_size)):
+        yield chunk_to_csv(priced, header=i == 0)
@@ -0,0 +1,153 @@
+"""Headless HTTP pricing service (ASGI).
+
+Run locally with::
+
+    uvicorn pricing_service:app --workers 4
+
+Endpoints
+    GET  /health          model/encoder versions and load metrics
+    POST /predict         one car as a JSON object
+    POST /predict/batch   ``{"cars": [...]}`` or a bare JSON list of cars
+
+A car uses the Prediction form fields: brand, model, fuel_type, transmission,
+km_driven, engine, mileage, seats and vehicle_age (or year). Encoding, model
+call and post-processing all go through ``pricing``, so the service and the
+Streamlit page return the same price for the same car. The model stays
+resident in ``model_registry``; predictions run in worker threads so the event
+loop keeps accepting requests while the model is busy.
+"""
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+
+import flat_model
+import model_registry
+import pricing
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, detail):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def _clip_age(age):
+    # Same range as ages derived from ``year`` (pricing.vehicle_age_from_year)
+    return np.clip(age, 0, pricing.MAX_AGE)
+
+
+def _price_records(cars):
+    if not cars:
+        return []
+    if not all(isinstance(car, dict) for car in cars):
+        raise HTTPError(400, "Each car must be a JSON object")
+    df = pd.DataFrame.from_records(cars)
+    df.columns = df.columns.str.strip().str.lower()
+    try:
+        if "vehicle_age" in df.columns:
+            df["vehicle_age"] = _clip_age(pd.to_numeric(df["vehicle_age"]))
+        priced = pricing.predict_prices(df)
+    except (TypeError, ValueError) as e:
+        raise HTTPError(400, str(e))
+    if priced["missing_fields"].any():
+        positions = ", ".join(map(str, np.flatnonzero(priced["missing_fields"].to_numpy())))
+        raise HTTPError(400, f"Missing or non-numeric fields in cars at positions: {positions}")
+    return priced[pricing.PRICE_COLS].round(2).to_dict(orient="records")
+
+
+def _price_one(car):
+    try:
+        if "vehicle_age" in car:
+            car = {**car, "vehicle_age": float(_clip_age(float(car["vehicle_age"])))}
+        priced = pricing.predict_price(car)
+    except (TypeError, ValueError) as e:
+        raise HTTPError(400, str(e))
+    return {k: round(v, 2) for k, v in priced.items()}
+
+
+def _health():
+    return {
+        "status": "ok",
+        "model_version": model_registry.version(model_registry.MODEL_PATH),
+        "encoders_version": model_registry.version(model_registry.ENCODERS_PATH, pricing.load_encoder_tables),
+        "features": pricing.FEATURES,
+        "price_cache": pricing.price_cache.stats(),
+        "artifacts": model_registry.stats(),
+    }
+
+
+async def _read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        if not message.get("more_body", False):
+            return body
+
+
+async def _send_json(send, status, payload):
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _handle(method, path, receive):
+    if path == "/health" and method == "GET":
+        return await asyncio.to_thread(_health)
+
+    if path not in ("/predict", "/predict/batch"):
+        raise HTTPError(404, "Not found")
+    if method != "POST":
+        raise HTTPError(405, "Method not allowed")
+
+    try:
+        payload = json.loads(await _read_body(receive) or b"null")
+    except json.JSONDecodeError as e:
+        raise HTTPError(400, f"Invalid JSON: {e}")
+
+    if path == "/predict":
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Expected a JSON object describing one car")
+        return await asyncio.to_thread(_price_one, payload)
+
+    cars = payload.get("cars") if isinstance(payload, dict) else payload
+    if not isinstance(cars, list):
+        raise HTTPError(400, 'Expected {"cars": [...]} or a JSON list of cars')
+    return {"predictions": await asyncio.to_thread(_price_records, cars)}
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Load once at startup so the first request doesn't pay for it
+                await asyncio.to_thread(flat_model.get_flat_model)
+                await asyncio.to_thread(model_registry.get_model)
+                await asyncio.to_thread(pricing.get_encoder_tables)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] != "http":
+        return
+
+    try:
+        result = await _handle(scope["method"], scope["path"].rstrip("/") or "/", receive)
+        await _send_json(send, 200, result)
+    except HTTPError as e:
+        await _send_json(send, e.status, {"detail": e.detail})
+    except Exception as e:
+        await _send_json(send, 500, {"detail": f"Prediction failed: {e}"})
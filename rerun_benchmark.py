@@ -0,0 +1,74 @@
+"""Per-rerun cost of getting the Analysis page's frame, before and after.
+
+Before: ``@st.cache_data`` around a copy of the listings. Every cache hit
+unpickles a fresh copy of the whole frame for the session, and the page then
+re-derived ``Mileage_Num``/``Engine_Num`` with ``str.extract`` regexes.
+After: ``Analysis.load_data()`` returns the registry's shared, read-only frame
+with the derived columns already in it.
+
+For each variant this prints the mean time per rerun and the peak memory
+allocated during one (``tracemalloc``), after a warm-up call that fills the
+caches.
+
+    python rerun_benchmark.py --reruns 50
+"""
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+import streamlit as st
+import streamlit.logger
+
+import Analysis
+import data_store
+
+streamlit.logger.set_log_level("error")  # no runtime or ScriptRunContext outside `streamlit run`
+
+
+@st.cache_data
+def _cached_copy():
+    df = data_store.load_listings().copy()
+    df.columns = df.columns.str.strip().str.replace(" ", "_").str.title()
+    df["Manufactured_By"] = df["Brand"]
+    df["Car_Model"] = df["Model"]
+    return df
+
+
+def before():
+    df = _cached_copy()
+    df["Mileage_Num"] = pd.to_numeric(df["Mileage"].astype(str).str.extract(r"(\d+\.?\d*)")[0], errors="coerce")
+    df["Engine_Num"] = pd.to_numeric(df["Engine"].astype(str).str.extract(r"(\d+)")[0], errors="coerce")
+    return df
+
+
+def after():
+    return Analysis.load_data()
+
+
+def measure(fn, reruns):
+    fn()  # warm-up: fills st.cache_data / the registry
+    start = time.perf_counter()
+    for _ in range(reruns):
+        fn()
+    per_rerun = (time.perf_counter() - start) / reruns
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_rerun, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+
+    for label, fn in (("before (cache_data + regex)", before), ("after (shared frame)", after)):
+        per_rerun, peak = measure(fn, args.reruns)
+        print(f"{label:<30} {per_rerun * 1e3:9.3f} ms/rerun  peak {peak / 1e6:8.3f} MB allocated")
+
+
+if __name__ == "__main__":
+    main()
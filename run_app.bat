@@ -7,7 +7,7 @@ python --version || (
 )
 
 echo ✅ Installing required packages...
-pip install streamlit pandas numpy plotly pillow scikit-learn streamlit-extras streamlit-option-menu python-dateutil
+pip install streamlit pandas numpy plotly pillow scikit-learn pyarrow streamlit-extras streamlit-option-menu python-dateutil
 
 echo 🚀 Running Streamlit app...
 python -m streamlit run Main.py
@@ -0,0 +1,108 @@
+"""Scatter plots whose browser payload stays bounded as the listings grow.
+
+``px.scatter`` sends every point (with its hover data) as SVG, so the figure
+JSON and the browser's layout work grow with the number of matching rows.
+``scatter`` picks a rendering mode from the row count:
+
+* up to ``SVG_MAX_POINTS``: a regular SVG scatter with full hover data;
+* up to ``WEBGL_MAX_POINTS``: the same figure drawn with ``Scattergl``;
+* above that: the points are binned on the server into a ``bins x bins``
+  density heatmap, so the payload no longer depends on the row count.
+
+Run ``python scatter_plot.py`` to print the figure payload per mode.
+"""
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+SVG_MAX_POINTS = 2_000
+WEBGL_MAX_POINTS = 20_000
+DENSITY_BINS = 80
+
+
+def render_mode(n_rows, density=None):
+    """``"svg"``, ``"webgl"`` or ``"density"`` for ``n_rows`` points.
+
+    ``density`` forces (True) or forbids (False) binning; ``None`` decides by size.
+    """
+    if density or (density is None and n_rows > WEBGL_MAX_POINTS):
+        return "density"
+    return "svg" if n_rows <= SVG_MAX_POINTS else "webgl"
+
+
+def _edges(values, bins):
+    low, high = float(values.min()), float(values.max())
+    if np.issubdtype(values.dtype, np.integer) and high - low < bins:
+        return np.arange(low - 0.5, high + 1.5)  # one bin per integer (e.g. year)
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return np.linspace(low, high, bins + 1)
+
+
+def density_figure(df, x, y, bins=DENSITY_BINS):
+    """Heatmap of point counts over a ``bins x bins`` grid."""
+    xs, ys = df[x].to_numpy(), df[y].to_numpy()
+    x_edges, y_edges = _edges(xs, bins), _edges(ys, bins)
+    counts, _, _ = np.histogram2d(xs, ys, bins=(x_edges, y_edges))
+    counts = np.where(counts > 0, counts, np.nan).T  # empty cells stay transparent
+    fig = go.Figure(go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=counts,
+        colorscale="Viridis",
+        colorbar=dict(title="Cars"),
+        hovertemplate=f"{x}: %{{x:.4g}}<br>{y}: %{{y:.4g}}<br>Cars: %{{z:,.0f}}<extra></extra>",
+    ))
+    fig.update_layout(xaxis_title=x, yaxis_title=y)
+    return fig
+
+
+def scatter(df, x, y, color=None, hover_data=None, density=None, bins=DENSITY_BINS, **kwargs):
+    """Scatter of ``df[y]`` against ``df[x]`` in the mode ``render_mode`` picks.
+
+    Rows missing ``x`` or ``y`` are dropped. ``color`` and ``hover_data`` are
+    only used for point modes; extra keyword arguments go to ``px.scatter``
+    and, where they are layout options (``template``), to the density figure.
+    """
+    df = df.dropna(subset=[x, y])
+    mode = render_mode(len(df), density)
+    if mode == "density":
+        fig = density_figure(df, x, y, bins)
+        if "template" in kwargs:
+            fig.update_layout(template=kwargs["template"])
+        return fig
+    return px.scatter(df, x=x, y=y, color=color, hover_data=hover_data,
+                      render_mode="webgl" if mode == "webgl" else "svg", **kwargs)
+
+
+def trendline(df, x, y, **line):
+    """Least-squares line through ``df``, drawn as two points whatever the row count."""
+    df = df.dropna(subset=[x, y])
+    if len(df) < 2 or df[x].nunique() < 2:
+        return None
+    m, b = np.polyfit(df[x], df[y], 1)
+    ends = np.array([df[x].min(), df[x].max()], dtype=float)
+    return go.Scatter(x=ends, y=m * ends + b, mode="lines", line=line or dict(color="red"), name="Trendline")
+
+
+def payload_size(fig):
+    """Bytes of figure JSON sent to the browser."""
+    return len(fig.to_json())
+
+
+def main():
+    import data_store
+
+    df = data_store.load_listings()
+    for n in (1_000, 10_000, 100_000, 1_000_000):
+        sample = df.sample(n, replace=n > len(df), random_state=0)
+        point = px.scatter(sample, x="year", y="selling_price", color="brand",
+                           hover_data=["model", "fuel_type", "transmission"])
+        fig = scatter(sample, x="year", y="selling_price", color="brand",
+                      hover_data=["model", "fuel_type", "transmission"])
+        print(f"{n:>9,} rows  px.scatter {payload_size(point) / 1e6:8.2f} MB  "
+              f"{render_mode(n):>7} {payload_size(fig) / 1e6:8.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
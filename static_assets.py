@@ -0,0 +1,97 @@
+"""Static assets (background images) for the Streamlit pages.
+
+Embedding an image as a base64 data URI puts the whole file into every rerun's
+CSS. With Streamlit static serving enabled (``.streamlit/config.toml``), an
+asset is instead published once per process into ``static/`` and referenced by
+URL, so browsers fetch it once and afterwards only revalidate it. The URL
+carries a content hash, so a changed image is picked up immediately. Without
+static serving the data URI is still built only once per process.
+
+Run ``python static_assets.py`` to see how many bytes per rerun this removes.
+"""
+import base64
+import mimetypes
+import os
+import shutil
+import sys
+import threading
+
+import model_registry
+
+STATIC_DIR = os.path.join(model_registry.BASE_DIR, "static")
+STATIC_URL = "app/static"
+BACKGROUND = os.path.join(model_registry.BASE_DIR, "assets", "263800.jpg")
+
+_lock = threading.Lock()
+_saved = {}  # path -> [uses, bytes not sent]
+
+
+def read_data_uri(path):
+    """Read ``path`` into a base64 ``data:`` URI (uncached)."""
+    mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    with open(path, "rb") as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode()}"
+
+
+def data_uri(path):
+    return model_registry.load(path, read_data_uri)
+
+
+def _publish(path):
+    target = os.path.join(STATIC_DIR, os.path.basename(path))
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    shutil.copyfile(path, target)
+    return f"{STATIC_URL}/{os.path.basename(path)}?v={model_registry.file_hash(path)[:12]}"
+
+
+def static_serving_enabled():
+    try:
+        import streamlit as st
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+def inline_size(path):
+    """Bytes a data URI for ``path`` adds to each rerun's payload."""
+    size = os.path.getsize(path)
+    return len(f"data:{mimetypes.guess_type(path)[0] or 'application/octet-stream'};base64,") + 4 * ((size + 2) // 3)
+
+
+def asset_url(path):
+    """URL to use in CSS/HTML for ``path``: a served static URL when possible, else a data URI."""
+    path = os.path.abspath(path)
+    if static_serving_enabled():
+        try:
+            url = model_registry.load(path, _publish)
+        except OSError:
+            pass
+        else:
+            with _lock:
+                entry = _saved.setdefault(path, [0, 0])
+                entry[0] += 1
+                entry[1] += inline_size(path) - len(url)
+            return url
+    return data_uri(path)
+
+
+def stats():
+    """Per asset: URL references served and payload bytes not inlined, this process."""
+    with _lock:
+        return {path: {"uses": uses, "bytes_saved": saved} for path, (uses, saved) in _saved.items()}
+
+
+def main():
+    # Home embeds the background twice per rerun (Main's CSS and its own), other pages once
+    paths = sys.argv[1:] or [BACKGROUND]
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"{path}: not found")
+            continue
+        inline = inline_size(path)
+        print(f"{path}: {os.path.getsize(path):,} bytes on disk, {inline:,} bytes as a data URI")
+        print(f"  per rerun removed: {inline:,} bytes (other pages), {2 * inline:,} bytes (Home)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Chunked processing of listing CSVs too large to load at once.
+
+The pages read ``car_dataset.csv`` into one frame per process; a nationwide
+dump of tens of millions of listings does not fit on a modest box. These
+commands read the file ``--chunksize`` rows at a time and hold one chunk plus
+per-group summaries in memory:
+
+* ``clean SRC OUT`` -- the cleaned listings as CSV, the same bytes as
+  ``data_store.clean(pd.read_csv(SRC)).to_csv(OUT, index=False)``;
+* ``stats SRC OUT`` -- the pickled ``aggregates.AggregateCube`` of the
+  cleaned listings;
+* ``predict SRC OUT`` -- the cleaned listings priced by ``pricing``, as the
+  Prediction page's bulk CSV.
+
+Cleaning makes two passes over the file (``data_store.iter_clean``) so that
+dtypes, categories and imputed values come out exactly as in memory. The
+statistics are exact too, except that sums and means of fractional measures
+(mileage, max power) can differ in the last bits, since floating-point sums
+depend on the order of addition.
+
+    python streaming.py clean dump.csv dump_clean.csv --chunksize 200000
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+import warnings
+
+import pandas as pd
+
+import aggregates
+import data_store
+import pricing
+
+try:
+    import resource
+except ImportError:  # not on Windows; peak memory is then not reported
+    resource = None
+
+
+def _write(path, pieces):
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="") as f:
+        for piece in pieces:
+            f.write(piece)
+    os.replace(tmp, path)
+
+
+def clean_csv(src, out, chunksize=data_store.CHUNK_SIZE):
+    _write(out, (chunk.to_csv(index=False, header=i == 0)
+                 for i, chunk in enumerate(data_store.iter_clean(src, chunksize))))
+
+
+def stats(src, out, chunksize=data_store.CHUNK_SIZE):
+    cube = aggregates.AggregateCube.from_chunks(data_store.iter_clean(src, chunksize))
+    tmp = out + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(cube, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, out)
+    return cube
+
+
+def predict_csv(src, out, chunksize=data_store.CHUNK_SIZE):
+    _write(out, pricing.price_csv(data_store.iter_clean(src, chunksize), chunksize))
+
+
+COMMANDS = {"clean": clean_csv, "stats": stats, "predict": predict_csv}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=list(COMMANDS))
+    parser.add_argument("src", help="listings CSV")
+    parser.add_argument("out", help="output file")
+    parser.add_argument("--chunksize", type=int, default=data_store.CHUNK_SIZE, help="rows per chunk")
+    args = parser.parse_args(argv)
+    warnings.simplefilter("once", pd.errors.DtypeWarning)  # otherwise repeated for every chunk
+
+    start = time.perf_counter()
+    COMMANDS[args.command](args.src, args.out, args.chunksize)
+    peak = f", peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB" if resource else ""
+    print(f"{args.command}: {args.src} -> {args.out} in {time.perf_counter() - start:.1f}s{peak}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""Rebuild the model artifacts from ``car_dataset.csv``.
+
+Replaces the hand-run notebook with one reproducible pipeline:
+
+1. **prepare** -- read and clean the CSV (``data_store.clean``), fit a
+   ``LabelEncoder`` per categorical column on the full dataset and build the
+   feature frame in ``pricing.FEATURES`` order with ``log(selling_price)`` as
+   the target;
+2. **split** -- hold out ``--test-size`` of the rows (``--random-state``);
+3. **fit** -- train the requested models in parallel, one worker per model
+   (``--n-jobs`` cores in all; RandomForest gets the cores left per worker);
+4. **evaluate** -- MAE/RMSE/R² on the log scale and MAPE/R² on prices, on the
+   held-out rows;
+5. **write** -- pickles plus ``metadata.json`` (dataset hash, parameters,
+   metrics, library versions, artifact hashes) into ``models/<version>/``.
+
+The prepare and fit stages are memoized under ``.cache/train`` keyed by their
+inputs (the dataset's content hash, ``PIPELINE``, model parameters), so
+re-running after a change only repeats the stages it affects. ``--install``
+copies the artifacts over the ones the app serves, models before encoders;
+``model_registry`` picks them up on the next request.
+
+    python train.py
+    python train.py --models GradientBoost RandomForest --n-jobs 4 --install
+
+With the defaults the GradientBoost pickle is trained on exactly the rows and
+settings of the shipped one (500 trees, depth 5, learning rate 0.05,
+``random_state=42``); predictions can still differ slightly where two splits
+tie in floating point.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import data_store
+import model_registry
+import pricing
+
+CACHE_DIR = os.path.join(data_store.SNAPSHOT_DIR, "train")
+MODELS_DIR = os.path.join(model_registry.BASE_DIR, "models")
+ENCODERS_FILE = os.path.basename(model_registry.ENCODERS_PATH)
+
+# name -> (estimator class path, parameters); artifacts are written as <name>_model.pkl
+MODELS = {
+    "GradientBoost": ("sklearn.ensemble.GradientBoostingRegressor", {
+        "n_estimators": 500, "max_depth": 5, "learning_rate": 0.05, "random_state": 42,
+    }),
+    "DecisionTreeRegressor": ("sklearn.tree.DecisionTreeRegressor", {
+        "criterion": "squared_error", "max_depth": 400, "min_samples_split": 10,
+        "min_samples_leaf": 7, "random_state": 50,
+    }),
+    "RandomForest": ("sklearn.ensemble.RandomForestRegressor", {
+        "criterion": "squared_error", "n_estimators": 700, "max_depth": 25,
+        "min_samples_split": 7, "min_samples_leaf": 5, "random_state": 50,
+    }),
+}
+DEFAULT_MODELS = ["GradientBoost", "DecisionTreeRegressor"]
+# Bump data_store.SNAPSHOT_VERSION when cleaning or imputation changes
+PIPELINE = (data_store.SNAPSHOT_VERSION, tuple(pricing.FEATURES))
+
+
+def _estimator(class_path, params):
+    module, name = class_path.rsplit(".", 1)
+    return getattr(importlib.import_module(module), name)(**params)
+
+
+def prepare(csv_path, sha256, pipeline):
+    """Encoders, feature frame and log target for the dataset with content hash ``sha256``.
+
+    ``pipeline`` (``PIPELINE``) is not used here; it is part of the memoization
+    key so that changes to cleaning, imputation or the feature list are not
+    served from a stale cache.
+    """
+    from sklearn.preprocessing import LabelEncoder
+
+    df = data_store.clean(pd.read_csv(csv_path))
+    encoders = {col: LabelEncoder().fit(df[col].astype(str)) for col in data_store.CATEGORICAL_COLS}
+    X = pricing.feature_frame(df, pricing.encoder_tables(encoders))
+    y = np.log(df["selling_price"].to_numpy(dtype=np.float64))
+    return encoders, X, y
+
+
+def fit(class_path, params, X, y):
+    start = time.perf_counter()
+    model = _estimator(class_path, params).fit(X, y)
+    return model, time.perf_counter() - start
+
+
+def evaluate(model, X, y):
+    from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error, r2_score
+
+    pred = model.predict(X)
+    price, pred_price = np.exp(y), np.exp(pred)
+    return {
+        "mae_log": float(mean_absolute_error(y, pred)),
+        "rmse_log": float(np.sqrt(np.mean((y - pred) ** 2))),
+        "r2_log": float(r2_score(y, pred)),
+        "mape_price": float(mean_absolute_percentage_error(price, pred_price)),
+        "r2_price": float(r2_score(price, pred_price)),
+    }
+
+
+def _versions():
+    import sklearn
+    return {"python": platform.python_version(), "sklearn": sklearn.__version__,
+            "numpy": np.__version__, "pandas": pd.__version__, "joblib": joblib.__version__}
+
+
+def _dump(obj, path):
+    tmp = path + ".tmp"
+    joblib.dump(obj, tmp)
+    os.replace(tmp, path)
+    return model_registry.file_hash(path)
+
+
+def install(version_dir, names):
+    """Copy a built version's artifacts over the ones the app loads.
+
+    Each file is replaced atomically, but not the set: the models go first
+    and the encoders last, so a process that reloads in between briefly
+    pairs the new models with the old encoders.
+    """
+    for name in [f"{n}_model.pkl" for n in names] + [ENCODERS_FILE]:
+        target = os.path.join(model_registry.BASE_DIR, name)
+        tmp = target + ".tmp"
+        shutil.copyfile(os.path.join(version_dir, name), tmp)
+        os.replace(tmp, target)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=data_store.DATASET_PATH, help="listings CSV")
+    parser.add_argument("--models", nargs="+", default=DEFAULT_MODELS, choices=list(MODELS))
+    parser.add_argument("--n-jobs", type=int, default=-1, help="parallel model fits (-1: all cores)")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--random-state", type=int, default=42, help="train/test split seed")
+    parser.add_argument("--out", default=MODELS_DIR, help="parent directory of versioned builds")
+    parser.add_argument("--no-cache", action="store_true", help="recompute every stage")
+    parser.add_argument("--install", action="store_true", help="replace the served artifacts")
+    args = parser.parse_args(argv)
+
+    from sklearn.model_selection import train_test_split
+
+    memory = joblib.Memory(None if args.no_cache else CACHE_DIR, verbose=0)
+    sha256 = model_registry.file_hash(args.data)
+
+    start = time.perf_counter()
+    encoders, X, y = memory.cache(prepare)(args.data, sha256, PIPELINE)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=args.test_size, random_state=args.random_state)
+    print(f"prepare: {len(X):,} rows ({len(X_train):,} train / {len(X_test):,} test) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    specs = [MODELS[name] for name in args.models]
+    # Split the cores between the model fits and RandomForest's own trees
+    cores = args.n_jobs if args.n_jobs > 0 else os.cpu_count() or 1
+    workers = min(cores, len(specs))
+    fitted = joblib.Parallel(n_jobs=workers)(
+        joblib.delayed(memory.cache(fit))(
+            class_path,
+            {**params, "n_jobs": max(1, cores // workers)} if class_path.endswith("RandomForestRegressor") else params,
+            X_train, y_train)
+        for class_path, params in specs
+    )
+    print(f"fit: {len(specs)} model(s) in {time.perf_counter() - start:.1f}s wall")
+
+    version = f"{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}-{sha256[:8]}"
+    version_dir = os.path.join(args.out, version)
+    os.makedirs(version_dir)
+    metadata = {
+        "version": version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "dataset": {"path": os.path.abspath(args.data), "sha256": sha256, "rows": len(X)},
+        "split": {"test_size": args.test_size, "random_state": args.random_state,
+                  "train_rows": len(X_train), "test_rows": len(X_test)},
+        "features": list(X.columns),
+        "target": "log(selling_price)",
+        "encoders": {col: len(enc.classes_) for col, enc in encoders.items()},
+        "versions": _versions(),
+        "artifacts": {ENCODERS_FILE: _dump(encoders, os.path.join(version_dir, ENCODERS_FILE))},
+        "models": {},
+    }
+    for name, (class_path, _), (model, fit_seconds) in zip(args.models, specs, fitted):
+        filename = f"{name}_model.pkl"
+        metadata["artifacts"][filename] = _dump(model, os.path.join(version_dir, filename))
+        metrics = evaluate(model, X_test, y_test)
+        metadata["models"][name] = {
+            "estimator": class_path, "params": model.get_params(),
+            "fit_seconds": round(fit_seconds, 2), "metrics": metrics,
+        }
+        print(f"  {name:<24} fit {fit_seconds:7.1f}s  RMSE(log) {metrics['rmse_log']:.4f}  "
+              f"R² {metrics['r2_price']:.4f}  MAPE {metrics['mape_price']:.2%}")
+
+    with open(os.path.join(version_dir, "metadata.json"), "w") as f:
+        json.dump(metadata, f, indent=2, default=str)
+    print(f"wrote {version_dir}")
+
+    if args.install:
+        install(version_dir, args.models)
+        print(f"installed {', '.join(args.models)} and {ENCODERS_FILE} into {model_registry.BASE_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())